@@ -19,8 +19,10 @@ class BaseAgent(ABC):
         pass
     
     def add_plugin(self, plugin):
-        self.plugins.append(plugin)
+        if plugin not in self.plugins:
+            self.plugins.append(plugin)
     
     async def cleanup(self):
-        """Cleanup resources"""
-        pass
\ No newline at end of file
+        """Cleanup resources: release every registered plugin's connections, workers and caches"""
+        for plugin in self.plugins:
+            await plugin.cleanup()
\ No newline at end of file
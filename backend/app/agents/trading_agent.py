@@ -3,6 +3,15 @@ from app.plugins.trading_plugin import TradingPlugin
 from app.plugins.email_plugin import EmailPlugin
 from semantic_kernel.agents import AzureAIAgent, AzureAIAgentSettings
 from azure.identity import DefaultAzureCredential
+from app.core.config_manager import config
+
+# Agent instructions, kept as one stable string so every run sends an identical prefix
+TRADING_AGENT_INSTRUCTIONS = (
+    "You are an AI assistant for trading and financial data analysis.\n"
+    "You can help users query trade data, explain trading concepts,\n"
+    "execute custom SQL queries, and provide general trading assistance.\n"
+    "Use the available plugin functions automatically when appropriate."
+)
 
 class TradingAgent(BaseAgent):
     def __init__(self, kernel):
@@ -11,6 +20,14 @@ class TradingAgent(BaseAgent):
     
     async def initialize(self):
         """Initialize trading agent with Azure AI Agent for automatic function calling"""
+        # Already initialized - don't rebuild plugins or create a second remote agent definition
+        if self.azure_agent is not None:
+            return
+        
+        # Fail at startup, before connecting plugins, if the agent has no model deployment to run on
+        if not config.AZURE_OPENAI_DEPLOYMENT:
+            raise ValueError("AZURE_OPENAI_DEPLOYMENT is not configured; cannot create the Azure AI Agent")
+        
         # Initialize plugins
         self.trading_plugin = TradingPlugin(self.kernel)
         await self.trading_plugin.initialize()
@@ -25,9 +42,6 @@ class TradingAgent(BaseAgent):
     
     async def _create_azure_ai_agent(self):
         """Create Azure AI Agent that handles automatic function calling"""
-        
-        from app.core.config_manager import config
-
         credential = DefaultAzureCredential(
             exclude_environment_credential=True,
             exclude_managed_identity_credential=True
@@ -39,10 +53,7 @@ class TradingAgent(BaseAgent):
         agent_def = await project_client.agents.create_agent(
             model=config.AZURE_OPENAI_DEPLOYMENT,  # Use your model name
             name="trading_assistant",
-            instructions="""You are an AI assistant for trading and financial data analysis.
-            You can help users query trade data, explain trading concepts, 
-            execute custom SQL queries, and provide general trading assistance.
-            Use the available plugin functions automatically when appropriate."""
+            instructions=TRADING_AGENT_INSTRUCTIONS
         )
         
         # Create Azure AI Agent that will handle automatic function calling
@@ -59,4 +70,14 @@ class TradingAgent(BaseAgent):
         
         # Azure AI Agent will automatically decide which functions to call
         response = await self.azure_agent.get_response([prompt])
-        return str(response)
\ No newline at end of file
+        return str(response)
+    
+    async def process_request_stream(self, prompt: str, context: dict = None):
+        """Stream the Azure AI Agent's answer as text chunks as they are generated"""
+        if not self.azure_agent:
+            raise ValueError("Azure AI Agent not initialized")
+        
+        async for response in self.azure_agent.invoke_stream(messages=[prompt]):
+            chunk = str(response)
+            if chunk:
+                yield chunk
\ No newline at end of file
@@ -6,12 +6,17 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-# Load environment variables from .env file
+# Load environment variables from .env file - the only place it is parsed; main.py reuses this result
 env_path = Path(__file__).parent.parent.parent / ".env"
+env_file_exists = env_path.exists()
 load_dotenv(dotenv_path=env_path)
 
 logger.info(f"Loading .env from: {env_path}")
-logger.info(f".env file exists: {env_path.exists()}")
+logger.info(f".env file exists: {env_file_exists}")
+
+def _mask_secret(secret):
+    """Show only the last four characters of a secret for diagnostics"""
+    return f"***{secret[-4:]}" if secret and len(secret) > 4 else "Not set"
 
 class Config:
     """Central configuration management with validation"""
@@ -41,6 +46,10 @@ class Config:
     def AZURE_OPENAI_API_VERSION(self):
         return os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")
     
+    @property
+    def AZURE_OPENAI_EMBEDDING_DEPLOYMENT(self):
+        return os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT")
+    
     @property
     def DATABRICKS_SERVER_HOSTNAME(self):
         return os.getenv("DATABRICKS_SERVER_HOSTNAME")
@@ -61,6 +70,22 @@ class Config:
     def DATABRICKS_SCHEMA(self):
         return os.getenv("DATABRICKS_SCHEMA", "trade_schema")
     
+    @property
+    def DATABRICKS_SCHEMA_VERSION(self):
+        return os.getenv("DATABRICKS_SCHEMA_VERSION", "1")
+    
+    @property
+    def SQL_RESULT_CACHE_TTL(self):
+        return float(os.getenv("SQL_RESULT_CACHE_TTL", "60"))
+    
+    @property
+    def EXPLANATION_TEMPERATURE(self):
+        return float(os.getenv("EXPLANATION_TEMPERATURE", "0.7"))
+    
+    @property
+    def LLM_TIMEOUT(self):
+        return float(os.getenv("LLM_TIMEOUT", "120"))
+    
     def validate_config(self):
         """Validate that required configuration is present"""
         # Reset status
@@ -131,16 +156,18 @@ class Config:
     
     def get_config_summary(self):
         """Get a summary of current configuration"""
+        # Each property is an environment lookup - read the endpoint (used three times) once
+        endpoint = self.AZURE_OPENAI_ENDPOINT
         return {
             "azure_openai": {
-                "endpoint": self.AZURE_OPENAI_ENDPOINT[:50] + "..." if self.AZURE_OPENAI_ENDPOINT and len(self.AZURE_OPENAI_ENDPOINT) > 50 else self.AZURE_OPENAI_ENDPOINT,
-                "api_key": "***" + self.AZURE_OPENAI_KEY[-4:] if self.AZURE_OPENAI_KEY and len(self.AZURE_OPENAI_KEY) > 4 else "Not set",
+                "endpoint": endpoint[:50] + "..." if endpoint and len(endpoint) > 50 else endpoint,
+                "api_key": _mask_secret(self.AZURE_OPENAI_KEY),
                 "deployment": self.AZURE_OPENAI_DEPLOYMENT,
                 "api_version": self.AZURE_OPENAI_API_VERSION
             },
             "databricks": {
                 "hostname": self.DATABRICKS_SERVER_HOSTNAME,
-                "access_token": "***" + self.DATABRICKS_ACCESS_TOKEN[-4:] if self.DATABRICKS_ACCESS_TOKEN and len(self.DATABRICKS_ACCESS_TOKEN) > 4 else "Not set",
+                "access_token": _mask_secret(self.DATABRICKS_ACCESS_TOKEN),
                 "http_path": self.DATABRICKS_HTTP_PATH,
                 "catalog": self.DATABRICKS_CATALOG,
                 "schema": self.DATABRICKS_SCHEMA
@@ -1,8 +1,63 @@
 # backend/app/core/kernel_setup.py (simple version)
+import logging
+from typing import Optional
+
+import httpx
+from openai import AsyncAzureOpenAI
 from semantic_kernel import Kernel
 from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
 from app.core.config_manager import config
 
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401 - only needed so httpx can negotiate HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Keep-alive pool shared by every Azure OpenAI call (chat and embeddings)
+AZURE_HTTP_MAX_KEEPALIVE = 20
+AZURE_HTTP_MAX_CONNECTIONS = 50
+AZURE_HTTP_KEEPALIVE_EXPIRY_SECONDS = 60.0
+# Fail fast on unreachable endpoints, but give completions time to generate
+AZURE_HTTP_TIMEOUT_SECONDS = 60.0
+AZURE_HTTP_CONNECT_TIMEOUT_SECONDS = 10.0
+
+_http_client: Optional[httpx.AsyncClient] = None
+_azure_openai_client: Optional[AsyncAzureOpenAI] = None
+
+def get_azure_openai_client() -> AsyncAzureOpenAI:
+    """Return the process-wide Azure OpenAI client backed by one pooled httpx client"""
+    global _http_client, _azure_openai_client
+    if _azure_openai_client is None:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_keepalive_connections=AZURE_HTTP_MAX_KEEPALIVE,
+                max_connections=AZURE_HTTP_MAX_CONNECTIONS,
+                keepalive_expiry=AZURE_HTTP_KEEPALIVE_EXPIRY_SECONDS
+            ),
+            timeout=httpx.Timeout(AZURE_HTTP_TIMEOUT_SECONDS, connect=AZURE_HTTP_CONNECT_TIMEOUT_SECONDS),
+            http2=HTTP2_AVAILABLE
+        )
+        _azure_openai_client = AsyncAzureOpenAI(
+            azure_endpoint=config.AZURE_OPENAI_ENDPOINT,
+            api_key=config.AZURE_OPENAI_KEY,
+            api_version=config.AZURE_OPENAI_API_VERSION,
+            http_client=_http_client
+        )
+        logger.info(f"Created shared Azure OpenAI client (http2={HTTP2_AVAILABLE})")
+    return _azure_openai_client
+
+async def close_azure_openai_client():
+    """Close the shared HTTP connection pool (call on application shutdown)"""
+    global _http_client, _azure_openai_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        logger.info("Closed shared Azure OpenAI HTTP client")
+    _http_client = None
+    _azure_openai_client = None
+
 def create_kernel() -> Kernel:
     """Create and configure the Semantic Kernel"""
     kernel = Kernel()
@@ -13,7 +68,8 @@ def create_kernel() -> Kernel:
         deployment_name=config.AZURE_OPENAI_DEPLOYMENT,
         endpoint=config.AZURE_OPENAI_ENDPOINT,
         api_key=config.AZURE_OPENAI_KEY,
-        api_version=config.AZURE_OPENAI_API_VERSION
+        api_version=config.AZURE_OPENAI_API_VERSION,
+        async_client=get_azure_openai_client()
     )
     kernel.add_service(azure_service)
     
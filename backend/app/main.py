@@ -1,8 +1,10 @@
 # backend/app/main.py
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import os
 import sys
 from contextlib import asynccontextmanager
@@ -10,48 +12,82 @@ import logging
 import traceback
 from pathlib import Path
 import json
-from dotenv import load_dotenv
 import asyncio
+import atexit
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener, RotatingFileHandler
+from queue import Queue
 
 # New imports for the modular structure
-from app.core.kernel_setup import create_kernel
+from app.core.kernel_setup import create_kernel, close_azure_openai_client
 from app.core.service_registry import AgentRegistry
-from app.core.config_manager import config
+from app.core.config_manager import config, env_path, env_file_exists
+from app.agents.trading_agent import TRADING_AGENT_INSTRUCTIONS
+from app.utils.llm_cache import LLMCache
 
-# Load .env from the backend directory first
-env_path = Path(__file__).parent.parent / ".env"
-load_dotenv(dotenv_path=env_path)
+# .env (backend directory) was loaded once by config_manager on import; its presence then is what diagnostics report
 print(f"✅ Loaded .env from: {env_path}")
 
-def setup_logging():
-    """Configure comprehensive logging"""
+# Records held in memory before app.log is written in one batch
+LOG_FILE_BUFFER_CAPACITY = 512
+# app.log rolls over at 16 MB, keeping app.log.1 .. app.log.5
+LOG_FILE_MAX_BYTES = 16 * 1024 * 1024
+LOG_FILE_BACKUP_COUNT = 5
+
+def setup_logging() -> QueueListener:
+    """Configure comprehensive logging; console and file writes happen on a background listener thread"""
     # Clear any existing handlers
     for handler in logging.root.handlers[:]:
         logging.root.removeHandler(handler)
     
-    # Set up root logger
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-            logging.FileHandler('app.log')  # Optional: also log to file
-        ]
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    stream_handler = logging.StreamHandler(sys.stdout)
+    # Optional: also log to file, rotated at a size cap (rollover runs on the listener thread)
+    # Decision: Each uvicorn worker gets its own file; workers rotating one shared app.log would clobber each other
+    log_file = f'app.{os.getpid()}.log' if int(os.getenv("WEB_CONCURRENCY", "1")) > 1 else 'app.log'
+    file_handler = RotatingFileHandler(
+        log_file, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUP_COUNT, encoding='utf-8'
+    )
+    for handler in (stream_handler, file_handler):
+        handler.setFormatter(formatter)
+    # Batch file writes; errors (and a full buffer) flush immediately so failures reach the log file right away
+    buffered_file_handler = MemoryHandler(
+        LOG_FILE_BUFFER_CAPACITY, flushLevel=logging.ERROR, target=file_handler, flushOnClose=True
     )
     
+    # Request paths only enqueue records; the listener thread does the blocking writes
+    log_queue = Queue(-1)
+    listener = QueueListener(log_queue, stream_handler, buffered_file_handler, respect_handler_level=True)
+    listener.start()
+    
+    def stop_logging():
+        """Drain queued records, then write out whatever is still buffered for the log file"""
+        listener.stop()
+        buffered_file_handler.flush()
+    
+    # Runs on interpreter exit, after uvicorn's own shutdown logging
+    atexit.register(stop_logging)
+    
+    # Set up root logger (the queue handler only enqueues; the listener's handlers apply the format)
+    logging.root.addHandler(QueueHandler(log_queue))
+    logging.root.setLevel(logging.INFO)
+    
     # Set specific levels for noisy modules if needed
     logging.getLogger('semantic_kernel').setLevel(logging.WARNING)
     logging.getLogger('urllib3').setLevel(logging.WARNING)
+    return listener
 
 # Call this function before creating the FastAPI app
-setup_logging()
+log_listener = setup_logging()
 
 # Set up logger
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
-# Global agent registry
-agent_registry = {}
+# Identical /ask prompts within the SQL result TTL reuse the previous answer
+ASK_CACHE_MAX_ENTRIES = 256
+# JSON bodies smaller than this are sent uncompressed; level 5 trades a little ratio for CPU
+GZIP_MINIMUM_SIZE = 500
+GZIP_COMPRESS_LEVEL = 5
 
 # Request/Response Models
 class AskRequest(BaseModel):
@@ -76,6 +112,13 @@ async def lifespan(app: FastAPI):
     # PAUSED: Schema loading to avoid costs
     logger.info("⏸️  Schema loading paused to avoid costs - will resume when needed")
     
+    # Per-app state instead of module globals; endpoints read it through request.app.state
+    app.state.agent_registry = {}
+    app.state.response_cache = LLMCache(max_entries=ASK_CACHE_MAX_ENTRIES, ttl_seconds=config.SQL_RESULT_CACHE_TTL)
+    # Agent turns currently running, keyed by response cache key, so concurrent identical prompts share one
+    app.state.inflight_asks = {}
+    agent_registry = app.state.agent_registry
+    
     try:
         # Create kernel
         kernel = create_kernel()
@@ -102,9 +145,16 @@ async def lifespan(app: FastAPI):
                 logger.info(f"🧹 {agent_name} agent cleaned up")
             except Exception as e:
                 logger.error(f"Error cleaning up {agent_name}: {str(e)}")
+        
+        # Close the pooled Azure OpenAI connections after every agent is done with them
+        await close_azure_openai_client()
+        
+        # Write buffered log records to app.log now rather than waiting for interpreter exit
+        for handler in log_listener.handlers:
+            handler.flush()
 
-# Create the FastAPI app with lifespan
-app = FastAPI(lifespan=lifespan, title="Azure AI Agent API")
+# Create the FastAPI app with lifespan; JSON bodies are encoded with orjson instead of the stdlib encoder
+app = FastAPI(lifespan=lifespan, title="Azure AI Agent API", default_response_class=ORJSONResponse)
 
 # CORS middleware
 origins = [
@@ -121,32 +171,112 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.post("/ask", response_model=AskResponse)
-async def ask_agent(request: AskRequest):
+class EventStreamAwareGZipMiddleware(GZipMiddleware):
+    """GZip responses, except Server-Sent Event streams whose chunks must reach the client unbuffered"""
+    
+    async def __call__(self, scope, receive, send):
+        """Bypass compression for requests that accept text/event-stream"""
+        if scope["type"] == "http" and b"text/event-stream" in dict(scope["headers"]).get(b"accept", b""):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+# Added after CORS; preflight replies are below the minimum size and go out uncompressed
+app.add_middleware(EventStreamAwareGZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE, compresslevel=GZIP_COMPRESS_LEVEL)
+
+def ask_success_response(result: str) -> ORJSONResponse:
+    """Build the AskResponse body directly, skipping Pydantic validation of a known-good payload"""
+    return ORJSONResponse({"response": result, "status": "success", "visualization": None, "has_chart": False})
+
+async def stream_agent_response(trading_agent, prompt: str):
+    """Relay agent output as Server-Sent Events, ending with a [DONE] marker; the whole stream shares one LLM_TIMEOUT deadline"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + config.LLM_TIMEOUT
+    chunks = trading_agent.process_request_stream(prompt)
+    try:
+        while True:
+            # Decision: Bound every wait by the time left, so a stalled model stream cannot hold the connection open
+            try:
+                chunk = await asyncio.wait_for(chunks.__anext__(), timeout=max(deadline - loop.time(), 0))
+            except StopAsyncIteration:
+                break
+            yield f"data: {json.dumps({'response': chunk})}\n\n"
+    except asyncio.TimeoutError:
+        logger.error(f"Agent stream timed out after {config.LLM_TIMEOUT}s in /ask")
+        detail = f"The agent did not finish responding within {config.LLM_TIMEOUT:g} seconds. Please retry."
+        yield f"event: error\ndata: {json.dumps({'detail': detail})}\n\n"
+    except Exception as e:
+        logger.error(f"Streaming error in /ask: {str(e)}")
+        yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+    finally:
+        # Release the upstream model stream on timeout, error or client disconnect
+        await chunks.aclose()
+    yield "data: [DONE]\n\n"
+
+@app.post("/ask", response_model=AskResponse, response_class=ORJSONResponse)
+async def ask_agent(request: AskRequest, http_request: Request):
     """Endpoint that uses Azure AI Agent for AUTOMATIC function calling"""
     logger.info(f"🚀 Received /ask request: {request.prompt[:100]}...")
     
     try:
         # Use trading agent (which now uses Azure AI Agent for auto-routing)
-        trading_agent = agent_registry.get("trading")
+        trading_agent = http_request.app.state.agent_registry.get("trading")
         if not trading_agent:
-            raise HTTPException(status_code=500, detail="Trading agent not initialized")
+            raise HTTPException(status_code=503, detail="Trading agent not initialized")
+        
+        # Clients that accept SSE get tokens as they are generated instead of after the full answer
+        if "text/event-stream" in http_request.headers.get("accept", ""):
+            return StreamingResponse(
+                stream_agent_response(trading_agent, request.prompt),
+                media_type="text/event-stream"
+            )
+        
+        # Decision: Serve an identical recent prompt from the response cache
+        response_cache = http_request.app.state.response_cache
+        cache_key = LLMCache.cache_key(
+            model=config.AZURE_OPENAI_DEPLOYMENT or "trading_assistant",
+            messages=[
+                {"role": "system", "content": TRADING_AGENT_INSTRUCTIONS},
+                {"role": "user", "content": " ".join(request.prompt.split())}
+            ]
+        )
+        result = response_cache.get(cache_key)
+        if result is not None:
+            logger.info("✅ /ask response cache hit")
+            return ask_success_response(result)
         
-        # Azure AI Agent will automatically handle function calling
-        result = await trading_agent.process_request(request.prompt)
+        # Azure AI Agent will automatically handle function calling; a stalled turn must not hold the request forever
+        inflight_asks = http_request.app.state.inflight_asks
+        agent_turn = inflight_asks.get(cache_key)
+        if agent_turn is None:
+            agent_turn = asyncio.ensure_future(
+                asyncio.wait_for(trading_agent.process_request(request.prompt), timeout=config.LLM_TIMEOUT)
+            )
+            inflight_asks[cache_key] = agent_turn
+            agent_turn.add_done_callback(lambda _: inflight_asks.pop(cache_key, None))
+        else:
+            logger.info("✅ Joining in-flight agent turn for an identical /ask prompt")
+        # Shield so a disconnecting client does not cancel the turn for the others
+        result = await asyncio.shield(agent_turn)
+        response_cache.set(cache_key, result)
         
-        return AskResponse(response=result, status="success", has_chart=False)
+        return ask_success_response(result)
         
+    except asyncio.TimeoutError:
+        logger.error(f"Agent request timed out after {config.LLM_TIMEOUT}s in /ask")
+        raise HTTPException(status_code=504, detail=f"The agent did not respond within {config.LLM_TIMEOUT:g} seconds. Please retry.")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Unexpected error in /ask: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @app.get("/health")
-async def health_check():
+async def health_check(http_request: Request):
     """Health check endpoint"""
     agents_status = {
         agent_name: "initialized" if agent else "not initialized"
-        for agent_name, agent in agent_registry.items()
+        for agent_name, agent in http_request.app.state.agent_registry.items()
     }
     
     return {
@@ -162,13 +292,9 @@ async def health_check():
     }
 
 @app.get("/diagnostics/detailed")
-async def detailed_diagnostics():
+def detailed_diagnostics():
     """Detailed diagnostic including environment variables"""
     try:
-        # Check if .env file exists
-        env_file = Path(__file__).parent.parent / ".env"
-        env_exists = env_file.exists()
-        
         # Get config summary
         config_summary = config.get_config_summary()
         
@@ -178,8 +304,8 @@ async def detailed_diagnostics():
         
         return {
             "status": "success",
-            "env_file_exists": env_exists,
-            "env_file_path": str(env_file),
+            "env_file_exists": env_file_exists,
+            "env_file_path": str(env_path),
             "environment_variables": config_summary,
             "missing_required_vars": missing_vars,
             "current_working_directory": os.getcwd(),
@@ -195,14 +321,37 @@ async def detailed_diagnostics():
             "error": str(e)
         }
 
+@app.get("/cache/stats")
+async def cache_stats(http_request: Request):
+    """Cache sizes and hit rates for /ask responses and the initialized agents' plugins"""
+    trading_agent = http_request.app.state.agent_registry.get("trading")
+    if not trading_agent or not getattr(trading_agent, "trading_plugin", None):
+        raise HTTPException(status_code=503, detail="Trading agent not initialized")
+    
+    return {
+        "status": "success",
+        "ask_responses": http_request.app.state.response_cache.stats,
+        "trading_plugin": trading_agent.trading_plugin.cache_stats()
+    }
+
 @app.get("/agents")
-async def list_agents():
+async def list_agents(http_request: Request):
     """List all available agents"""
     return {
         "available_agents": AgentRegistry.list_agents(),
-        "initialized_agents": list(agent_registry.keys())
+        "initialized_agents": list(http_request.app.state.agent_registry.keys())
     }
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # uvicorn picks uvloop/httptools automatically when installed (uvicorn[standard]); reload is opt-in for development
+    reload = os.getenv("DEV_RELOAD") == "1"
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    # Reload and multiple workers re-import the app, which needs an import string
+    uvicorn.run(
+        "app.main:app" if reload or workers > 1 else app,
+        host="0.0.0.0",
+        port=8000,
+        reload=reload,
+        workers=workers
+    )
\ No newline at end of file
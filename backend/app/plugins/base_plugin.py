@@ -11,4 +11,8 @@ class BasePlugin(ABC):
     @abstractmethod
     async def initialize(self):
         """Initialize plugin resources"""
+        pass
+    
+    async def cleanup(self):
+        """Release plugin resources on shutdown (no-op unless a plugin holds any)"""
         pass
\ No newline at end of file
@@ -2,111 +2,451 @@
 from .base_plugin import BasePlugin
 #from semantic_kernel.plugin import kernel_function
 from semantic_kernel.functions import kernel_function
+from semantic_kernel.contents import ChatHistory
+from semantic_kernel.connectors.ai.open_ai import (
+    AzureChatCompletion,
+    AzureTextEmbedding,
+    OpenAIChatPromptExecutionSettings,
+)
 
-from typing import Dict, List, Optional, Any, Tuple
-import json
+from typing import Callable, Dict, List, Optional, Any, Tuple
+import hashlib
 import logging
+import re
 import time
 import asyncio
+import queue
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 
+import orjson
+
+from app.core.config_manager import config
+from app.core.kernel_setup import get_azure_openai_client
+from app.utils.batch_embedder import BatchEmbedder
+from app.utils.llm_cache import LLMCache
+from app.utils.semantic_cache import SemanticCache
+from app.utils.sql_generator import SQLGenerator, strip_sql_literals
+
 logger = logging.getLogger(__name__)
 
+# pandas + matplotlib are imported on the first chart request, not at application startup
+_visualization_service = None
+_visualization_import_failed = False
+
+def _get_visualization_service():
+    """Import the visualization service on first use; None if its libraries are not installed"""
+    global _visualization_service, _visualization_import_failed
+    if _visualization_service is None and not _visualization_import_failed:
+        try:
+            from app.utils.visualization_service import visualization_service
+            _visualization_service = visualization_service
+        except ImportError as e:
+            logger.warning("⭐ Visualization service not available: %s", e)
+            _visualization_import_failed = True
+    return _visualization_service
+
+try:
+    import databricks.sql
+    DATABRICKS_AVAILABLE = True
+except ImportError as e:
+    logger.warning("⭐ Databricks SQL connector not installed: %s", e)
+    DATABRICKS_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    ARROW_AVAILABLE = True
+except ImportError as e:
+    logger.warning("⭐ pyarrow not available, using row-based result handling: %s", e)
+    ARROW_AVAILABLE = False
+
+try:
+    import sqlglot
+    from sqlglot import expressions as sqlglot_exp
+    SQLGLOT_AVAILABLE = True
+except ImportError as e:
+    logger.warning("⭐ sqlglot not available, using keyword-based SQL validation: %s", e)
+    SQLGLOT_AVAILABLE = False
+
+# Maximum number of idle Databricks connections kept open for reuse
+DATABRICKS_POOL_SIZE = 4
+# Connections opened at startup so the first queries skip the TLS/auth handshake
+DATABRICKS_POOL_MIN_SIZE = 2
+# Pooled connections idle for longer than this are health-checked before reuse
+DATABRICKS_IDLE_CHECK_SECONDS = 60
+
+# Upper bound on rows fetched into memory for a single query
+MAX_RESULT_ROWS = 1000
+
+# Rows rendered in the compact table; the remainder is summarized as a count
+RESULT_PREVIEW_ROWS = 50
+# Columns shown first in the compact table when present, then filled up to MAX_KEY_COLUMNS
+PRIORITY_COLUMNS = (
+    'deal_num', 'tran_num', 'trade_date', 'currency', 'amount',
+    'volume', 'price', 'trader', 'buy_sell', 'status'
+)
+MAX_KEY_COLUMNS = 6
+
+# Query result cache for repeated identical SELECTs (TTL from SQL_RESULT_CACHE_TTL)
+QUERY_CACHE_MAX_ENTRIES = 256
+NON_DETERMINISTIC_SQL_TOKENS = ("current_date", "current_timestamp", "now()", "rand(", "uuid(")
+
+# Query words and two-word phrases that ask for a chart alongside the result table; matched
+# against whole words so e.g. 'stop' or 'laptop' don't trigger 'top' ('bar chart' is covered by 'chart')
+VISUALIZATION_KEYWORDS = frozenset({
+    "chart", "charts", "graph", "graphs", "plot", "plots", "visualize", "visualise",
+    "trend", "trends", "distribution", "percentage", "compare", "comparison",
+    "top", "best", "worst", "ranking", "analyze", "histogram"
+})
+VISUALIZATION_PHRASES = frozenset({("show", "me")})
+_WORD_RE = re.compile(r"[a-z]+")
+
+# Per-conversation message history is a ring buffer; conversations are an LRU swept by idle time
+CONVERSATION_MAX_MESSAGES = 100
+CONVERSATION_MAX_ENTRIES = 10000
+CONVERSATION_TTL_SECONDS = 3600
+CONVERSATION_SWEEP_INTERVAL_SECONDS = 60
+
+# Exact-match LRU cache of LLM concept explanations, keyed by a hash of the normalized request
+EXPLANATION_CACHE_MAX_ENTRIES = 256
+EXPLANATION_CACHE_TTL_SECONDS = 3600
+# All static instructions live in the system message so the prompt prefix is identical on every call
+# (provider-side prompt caching); only the concept varies, at the tail of the user turn
+EXPLAIN_SYSTEM_MESSAGE = """You are a helpful trading assistant that provides clear explanations.
+
+When given a concept, provide a clear, comprehensive explanation of it in the context of trading and finance.
+
+Your explanation should include:
+1. A simple and clear definition
+2. How it works in practical trading scenarios
+3. Why it's important in financial markets
+4. Real-world examples or use cases
+5. Any related concepts or terminology
+
+Make it professional yet accessible."""
+EXPLAIN_PROMPT_TEMPLATE = "Concept: {concept}"
+# Question framing stripped from a concept before keying the caches ("What is a swap?" -> "a swap")
+_CONCEPT_QUESTION_RE = re.compile(
+    r"^\s*(?:what\s+is|what\s+are|explain|define|tell\s+me\s+about)\s+(.*?)\s*\??\s*$", re.IGNORECASE
+)
+# Embedding-based cache so paraphrased concepts ("swap" / "a swap contract") share an answer
+SEMANTIC_CACHE_THRESHOLD = 0.92
+SEMANTIC_CACHE_MAX_ENTRIES = 1000
+
+# Azure OpenAI chat client shared by every plugin instance in the process, and the pooled client it was built on
+_AZURE_CHAT_SERVICE = None
+_AZURE_CHAT_SERVICE_CLIENT = None
+
+# cursor.description type codes whose values render via isoformat() vs. plain str()
+TEMPORAL_TYPE_CODES = frozenset({"date", "timestamp", "timestamp_ntz"})
+NON_TEMPORAL_TYPE_CODES = frozenset({
+    "string", "char", "varchar", "boolean", "tinyint", "smallint", "int", "bigint",
+    "float", "double", "decimal", "binary", "array", "map", "struct", "interval"
+})
+
+# Custom query safety checks
+_DESTRUCTIVE_SQL_RE = re.compile(
+    r"\b(?:drop|delete|update|insert|alter|truncate|create|modify|grant|revoke)\b", re.IGNORECASE
+)
+_READ_ONLY_SQL_LEAD_RE = re.compile(r"^[\s(]*(?:select|with)\b", re.IGNORECASE)
+# Parsed-statement node types that make a query non-read-only
+_SQLGLOT_WRITE_NODES = tuple(
+    getattr(sqlglot_exp, name)
+    for name in ("Insert", "Update", "Delete", "Merge", "Drop", "Alter", "Create",
+                 "TruncateTable", "Grant", "Revoke", "Command")
+    if hasattr(sqlglot_exp, name)
+) if SQLGLOT_AVAILABLE else ()
+SQL_VALIDATION_CACHE_MAX_ENTRIES = 256
+
+@lru_cache(maxsize=SQL_VALIDATION_CACHE_MAX_ENTRIES)
+def _is_read_only_statement(sql_query: str) -> bool:
+    """Parse SQL and accept exactly one query statement (SELECT, set operation, parenthesized query) with no write nodes"""
+    try:
+        statements = [statement for statement in sqlglot.parse(sql_query, read="databricks") if statement is not None]
+    except sqlglot.errors.SqlglotError:
+        return False
+    if len(statements) != 1:
+        return False
+    tree = statements[0]
+    # Query covers Select, Union/Intersect/Except and Subquery
+    if not isinstance(tree, sqlglot_exp.Query):
+        return False
+    return tree.find(*_SQLGLOT_WRITE_NODES) is None
+
+def _normalize_sql(sql_query: str) -> str:
+    """Collapse whitespace and lowercase SQL; computed once per query and shared by the cache keys"""
+    return " ".join(sql_query.split()).lower()
+
+def _dumps_json(payload) -> str:
+    """Serialize a response payload to a JSON string with orjson"""
+    return orjson.dumps(payload, option=orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY).decode("utf-8")
+
+def _convert_cell(value) -> str:
+    """Render a result cell as text: NULL, ISO date/time, or str()"""
+    if value is None:
+        return "NULL"
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def _null_or_iso(value) -> str:
+    return "NULL" if value is None else value.isoformat()
+
+
+def _null_or_str(value) -> str:
+    return "NULL" if value is None else str(value)
+
+
 class TradingPlugin(BasePlugin):
     def __init__(self, kernel):
         super().__init__(kernel, "TradingPlugin")
         self.sql_generator = None
-        self.conversations: Dict[str, Dict] = {}
+        # Least recently used first, so idle sweeps and size eviction both pop from the front
+        self.conversations: "OrderedDict[str, Dict]" = OrderedDict()
+        self._last_conversation_sweep = time.monotonic()
         self.chat_service = None
+        self.embedding_service = None
+        self._batch_embedder = None
+        self._semantic_cache = SemanticCache(
+            threshold=SEMANTIC_CACHE_THRESHOLD,
+            max_entries=SEMANTIC_CACHE_MAX_ENTRIES
+        )
+        self._initialized = False
+        # Idle connections as (connection, last_used monotonic time)
+        self._connection_pool: "queue.Queue" = queue.Queue(maxsize=DATABRICKS_POOL_SIZE)
+        # One worker per pooled connection, so concurrent queries never outgrow the pool
+        self._db_executor = ThreadPoolExecutor(max_workers=DATABRICKS_POOL_SIZE, thread_name_prefix="databricks")
+        self._query_cache: "OrderedDict[bytes, Tuple[float, List[str], List[Dict], bool]]" = OrderedDict()
+        self._query_cache_ttl = config.SQL_RESULT_CACHE_TTL
+        self._explain_cache = LLMCache(
+            max_entries=EXPLANATION_CACHE_MAX_ENTRIES,
+            ttl_seconds=EXPLANATION_CACHE_TTL_SECONDS
+        )
+        self._row_templates: "OrderedDict[Tuple[str, ...], str]" = OrderedDict()
+        self._key_columns_cache: "OrderedDict[Tuple[str, ...], List[str]]" = OrderedDict()
+        # System prefix built once; each explanation copies its messages and appends the user turn
+        self._explain_history_template = ChatHistory()
+        self._explain_history_template.add_system_message(EXPLAIN_SYSTEM_MESSAGE)
+        self._explain_temperature = config.EXPLANATION_TEMPERATURE
+        # Only a temperature-0 answer is the one the model would give again, so only those are cached
+        self._cache_explanations = self._explain_temperature == 0
+        self._explain_settings = OpenAIChatPromptExecutionSettings(
+            service_id="azure_gpt4o",
+            max_tokens=1000,
+            temperature=self._explain_temperature
+        )
+        # Explanation calls currently awaiting the model, keyed by request cache key
+        self._inflight_explanations: Dict[str, "asyncio.Task"] = {}
     
     async def initialize(self):
         """Initialize trading plugin"""
         logger.info("⭐ TradingPlugin.initialize() - Entry")
+        if self._initialized:
+            logger.info("⭐ TradingPlugin already initialized, skipping")
+            return
         try:
             # Initialize Azure OpenAI service
-            await self._initialize_azure_openai()
+            self._initialize_azure_openai()
+            
+            # Embeddings only back the semantic explanation cache, so they are optional
+            self._initialize_embedding_service()
             
             # SQL Generator will be initialized lazily to save costs
             # Uncomment when needed
-            self.sql_generator = await self._initialize_sql_generator()  
+            self.sql_generator = self._initialize_sql_generator()  
             
+            # Pre-warm Databricks connections off the event loop
+            if DATABRICKS_AVAILABLE and config.databricks_valid:
+                await self._run_database_work(self._prewarm_connection_pool)
+            
+            self._initialized = True
             logger.info("⭐ TradingPlugin.initialize() - Success")
             
         except Exception as e:
-            logger.error(f"💥 TradingPlugin.initialize() - Failed: {str(e)}")
+            logger.error("💥 TradingPlugin.initialize() - Failed: %s", e)
             raise
     
-    async def _initialize_azure_openai(self):
+    def _initialize_azure_openai(self):
         """Initialize Azure OpenAI connection"""
+        global _AZURE_CHAT_SERVICE, _AZURE_CHAT_SERVICE_CLIENT
         logger.info("⭐ _initialize_azure_openai() - Entry")
+        if self.chat_service is not None:
+            logger.info("⭐ Azure OpenAI service already initialized for this plugin")
+            return
         try:
-            from app.core.config_manager import config
-            
             # Check if service already exists in kernel
             try:
                 self.chat_service = self.kernel.get_service("azure_gpt4o")
                 logger.info("⭐ Azure OpenAI service already exists in kernel, reusing it")
                 return
             except ValueError:
-                logger.info("⭐ Creating new Azure OpenAI service")
+                logger.info("⭐ Azure OpenAI service not registered in kernel, adding it")
                 pass
             
-            if not all([config.AZURE_OPENAI_ENDPOINT, config.AZURE_OPENAI_KEY, config.AZURE_OPENAI_DEPLOYMENT]):
-                raise ValueError("Missing required Azure OpenAI configuration")
-            
-            from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
-            
-            self.chat_service = AzureChatCompletion(
-                service_id="azure_gpt4o",
-                deployment_name=config.AZURE_OPENAI_DEPLOYMENT,
-                endpoint=config.AZURE_OPENAI_ENDPOINT,
-                api_key=config.AZURE_OPENAI_KEY,
-                api_version=config.AZURE_OPENAI_API_VERSION
-            )
+            # Decision: Reuse the process-wide client instead of building a new one per kernel, unless the
+            # pooled client was closed and recreated since (app restart, reload, tests)
+            shared_client = get_azure_openai_client()
+            if _AZURE_CHAT_SERVICE is None or _AZURE_CHAT_SERVICE_CLIENT is not shared_client:
+                if not all([config.AZURE_OPENAI_ENDPOINT, config.AZURE_OPENAI_KEY, config.AZURE_OPENAI_DEPLOYMENT]):
+                    raise ValueError("Missing required Azure OpenAI configuration")
+                
+                _AZURE_CHAT_SERVICE = AzureChatCompletion(
+                    service_id="azure_gpt4o",
+                    deployment_name=config.AZURE_OPENAI_DEPLOYMENT,
+                    endpoint=config.AZURE_OPENAI_ENDPOINT,
+                    api_key=config.AZURE_OPENAI_KEY,
+                    api_version=config.AZURE_OPENAI_API_VERSION,
+                    async_client=shared_client
+                )
+                _AZURE_CHAT_SERVICE_CLIENT = shared_client
+            else:
+                logger.info("⭐ Reusing shared Azure OpenAI client")
             
+            self.chat_service = _AZURE_CHAT_SERVICE
             self.kernel.add_service(self.chat_service)
             logger.info("⭐ Azure OpenAI GPT-4o initialized successfully")
             
         except Exception as e:
-            logger.error(f"💥 _initialize_azure_openai() - Failed: {str(e)}")
+            logger.error("💥 _initialize_azure_openai() - Failed: %s", e)
             raise
     
-    async def _initialize_sql_generator(self):
+    def _initialize_embedding_service(self):
+        """Initialize the Azure OpenAI embedding service used by the semantic cache"""
+        logger.info("⭐ _initialize_embedding_service() - Entry")
+        if not config.AZURE_OPENAI_EMBEDDING_DEPLOYMENT:
+            logger.info("⭐ Decision: No embedding deployment configured, semantic cache disabled")
+            return
+        try:
+            self.embedding_service = AzureTextEmbedding(
+                service_id="azure_embedding",
+                deployment_name=config.AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
+                endpoint=config.AZURE_OPENAI_ENDPOINT,
+                api_key=config.AZURE_OPENAI_KEY,
+                api_version=config.AZURE_OPENAI_API_VERSION,
+                async_client=get_azure_openai_client()
+            )
+            # Concurrent explanations share embedding round-trips (up to 16 inputs per request)
+            self._batch_embedder = BatchEmbedder(self.embedding_service)
+            logger.info("⭐ Azure OpenAI embedding service initialized successfully")
+        except Exception as e:
+            logger.warning("⭐ Embedding service unavailable, semantic cache disabled: %s", e)
+            self.embedding_service = None
+            self._batch_embedder = None
+    
+    def _normalize_concept(self, concept: str) -> str:
+        """Reduce a concept to its cache key: drop question framing, collapse whitespace, lowercase"""
+        match = _CONCEPT_QUESTION_RE.match(concept)
+        core = match.group(1) if match and match.group(1) else concept
+        return " ".join(core.rstrip().rstrip("?").split()).lower()
+
+    def _explanation_cache_key(self, concept_key: str) -> str:
+        """Exact-match cache key for a normalized concept's explanation"""
+        return LLMCache.cache_key(
+            model=config.AZURE_OPENAI_DEPLOYMENT or "azure_gpt4o",
+            messages=[
+                {"role": "system", "content": EXPLAIN_SYSTEM_MESSAGE},
+                {"role": "user", "content": concept_key}
+            ],
+            temperature=self._explain_temperature
+        )
+
+    async def _embed_concept(self, concept_key: str):
+        """Embed a normalized concept for the semantic cache; None if embeddings are unavailable"""
+        if not self._batch_embedder:
+            return None
+        try:
+            return await self._batch_embedder.embed(concept_key)
+        except Exception as e:
+            logger.warning("⭐ Concept embedding failed, skipping semantic cache: %s", e)
+            return None
+    
+    async def _submit_llm(self, request_key: str, chat_history: ChatHistory, settings) -> Optional[str]:
+        """Run a chat completion, sharing one in-flight call between identical concurrent requests"""
+        task = self._inflight_explanations.get(request_key)
+        if task is not None:
+            logger.info("⭐ Decision: Joining in-flight LLM request instead of sending a duplicate")
+        else:
+            task = asyncio.ensure_future(self._complete_chat(chat_history, settings))
+            self._inflight_explanations[request_key] = task
+            task.add_done_callback(lambda _: self._inflight_explanations.pop(request_key, None))
+        # Shield so one cancelled caller does not cancel the call for the others
+        return await asyncio.shield(task)
+    
+    async def _complete_chat(self, chat_history: ChatHistory, settings) -> Optional[str]:
+        """Send one chat completion request and return the first message content"""
+        result = await self.chat_service.get_chat_message_contents(
+            chat_history=chat_history,
+            settings=settings
+        )
+        return result[0].content if result else None
+    
+    def _initialize_sql_generator(self):
         """Initialize SQL generator"""
         logger.info("⭐ _initialize_sql_generator() - Entry")
         try:
-            from app.utils.sql_generator import SQLGenerator
             sql_generator = SQLGenerator()
             logger.info("⭐ SQL Generator initialized successfully")
             return sql_generator
         except Exception as e:
-            logger.error(f"💥 _initialize_sql_generator() - Failed: {str(e)}")
+            logger.error("💥 _initialize_sql_generator() - Failed: %s", e)
             raise
 
     def _get_conversation_context(self, conversation_id: str) -> Dict:
         """Get or create conversation context"""
-        logger.info(f"⭐ _get_conversation_context() - Conversation ID: {conversation_id}")
-        if conversation_id not in self.conversations:
-            logger.info(f"⭐ Creating new conversation context for ID: {conversation_id}")
-            self.conversations[conversation_id] = {
-                "messages": [],
-                "created_at": time.time(),
+        logger.info("⭐ _get_conversation_context() - Conversation ID: %s", conversation_id)
+        now = time.monotonic()
+        if now - self._last_conversation_sweep >= CONVERSATION_SWEEP_INTERVAL_SECONDS:
+            self._sweep_conversations(now)
+        context = self.conversations.get(conversation_id)
+        if context is None:
+            logger.info("⭐ Creating new conversation context for ID: %s", conversation_id)
+            context = {
+                "messages": deque(maxlen=CONVERSATION_MAX_MESSAGES),
+                "created_at": now,
+                "last_accessed": now,
                 "pending_clarification": None
             }
-        return self.conversations[conversation_id]
+            self.conversations[conversation_id] = context
+            while len(self.conversations) > CONVERSATION_MAX_ENTRIES:
+                self.conversations.popitem(last=False)
+        else:
+            context["last_accessed"] = now
+            self.conversations.move_to_end(conversation_id)
+        return context
+
+    def _sweep_conversations(self, now: float):
+        """Drop conversations idle for longer than the conversation TTL"""
+        self._last_conversation_sweep = now
+        cutoff = now - CONVERSATION_TTL_SECONDS
+        expired = 0
+        # LRU order means the idle conversations are all at the front
+        while self.conversations:
+            oldest_context = next(iter(self.conversations.values()))
+            if oldest_context["last_accessed"] >= cutoff:
+                break
+            self.conversations.popitem(last=False)
+            expired += 1
+        if expired:
+            logger.info("⭐ Swept %s idle conversation(s)", expired)
 
     def _get_databricks_connection(self):
         """Get Databricks connection with error handling"""
         logger.info("⭐ _get_databricks_connection() - Entry")
+        if not DATABRICKS_AVAILABLE:
+            logger.error("💥 Databricks SQL connector not installed")
+            return None
+        
         try:
-            from app.core.config_manager import config
-            import databricks.sql
-            
             if not all([config.DATABRICKS_SERVER_HOSTNAME, config.DATABRICKS_ACCESS_TOKEN, config.DATABRICKS_HTTP_PATH]):
                 logger.error("⭐ Databricks connection parameters not configured")
                 return None
             
-            logger.info(f"⭐ Connecting to Databricks: {config.DATABRICKS_SERVER_HOSTNAME}")
+            logger.info("⭐ Connecting to Databricks: %s", config.DATABRICKS_SERVER_HOSTNAME)
             connection = databricks.sql.connect(
                 server_hostname=config.DATABRICKS_SERVER_HOSTNAME,
                 http_path=config.DATABRICKS_HTTP_PATH,
@@ -116,11 +456,8 @@ class TradingPlugin(BasePlugin):
             logger.info("⭐ Connected to Databricks successfully")
             return connection
             
-        except ImportError as e:
-            logger.error(f"💥 Databricks SQL connector not installed: {e}")
-            return None
         except Exception as e:
-            logger.error(f"💥 Failed to connect to Databricks: {str(e)}")
+            logger.error("💥 Failed to connect to Databricks: %s", e)
             return None
 
 
@@ -130,10 +467,10 @@ class TradingPlugin(BasePlugin):
     )
     async def query_trade_data(self, natural_language_query: str = "") -> str:
         """Query trade data using natural language to SQL conversion"""
-        logger.info(f"⭐ query_trade_data() - Entry: '{natural_language_query[:50]}...'")
+        logger.info("⭐ query_trade_data() - Entry: '%s...'", natural_language_query[:50])
         
         try:
-            logger.info(f"⭐ Processing natural language query: {natural_language_query}")
+            logger.info("⭐ Processing natural language query: %s", natural_language_query)
             
             if not self.sql_generator:
                 logger.error("⭐ SQL Generator not available - cost saving mode")
@@ -145,20 +482,25 @@ class TradingPlugin(BasePlugin):
                 natural_language_query, self.kernel
             )
             
-            logger.info(f"⭐ Generated SQL: {sql_query}")
+            logger.info("⭐ Generated SQL: %s", sql_query)
             
             # If SQL generation failed, provide a helpful response
-            if "error" in sql_query.lower() or "not available" in sql_query.lower():
-                logger.warning(f"⭐ SQL generation failed: {sql_query}")
+            sql_lower = sql_query.lower()
+            if "error" in sql_lower or "not available" in sql_lower:
+                logger.warning("⭐ SQL generation failed: %s", sql_query)
                 return f"I couldn't generate a valid SQL query for your request. Please try rephrasing your question. Error: {sql_query}"
             
+            # Decided from the question alone, so no chart work is awaited when none was asked for
+            visualization_wanted = self._should_visualize(natural_language_query)
+            
             # Execute the query and get results
             logger.info("⭐ Executing SQL query")
             result_text, raw_data = await self._execute_sql_query(sql_query, natural_language_query)
             
             # Generate visualization if appropriate
-            logger.info("⭐ Checking if visualization is needed")
-            chart_data = await self._generate_visualization_if_needed(natural_language_query, raw_data)
+            chart_data = None
+            if visualization_wanted and raw_data:
+                chart_data = await self._generate_visualization(natural_language_query, raw_data)
             
             if chart_data:
                 logger.info("⭐ Visualization generated successfully, returning JSON response")
@@ -167,14 +509,13 @@ class TradingPlugin(BasePlugin):
                     "visualization": chart_data,
                     "has_chart": True
                 }
-                return json.dumps(response_data)
+                return _dumps_json(response_data)
             else:
                 logger.info("⭐ No visualization needed, returning text response only")
                 return result_text
                 
         except Exception as e:
-            error_msg = f"💥 Error processing query: {str(e)}"
-            logger.error(error_msg)
+            logger.error("💥 Error processing query: %s", e)
             return f"I encountered an error while processing your request. Please try again or rephrase your question. Error: {str(e)}"
         finally:
             logger.info("⭐ query_trade_data() - Exit")
@@ -182,77 +523,288 @@ class TradingPlugin(BasePlugin):
 
     async def _execute_sql_query(self, sql_query: str, original_query: str = "") -> Tuple[str, Optional[List[Dict]]]:
         """Execute SQL query and return both formatted results and raw data"""
-        logger.info(f"⭐ _execute_sql_query() - Entry: {sql_query[:100]}...")
+        logger.info("⭐ _execute_sql_query() - Entry: %s...", sql_query[:100])
         
-        connection = self._get_databricks_connection()
-        if connection is None:
-            logger.error("⭐ Database connection not available")
-            return "Database connection not available. Please check Databricks configuration.", None
+        # Decision: Serve identical recent SELECTs from the result cache
+        normalized_sql = _normalize_sql(sql_query)
+        cache_key = self._query_cache_key(normalized_sql)
+        cached = self._get_cached_query(cache_key)
+        if cached is not None:
+            columns, raw_data, truncated = cached
+            logger.info("⭐ Query result cache hit, %s rows", len(raw_data))
+            result_text = self._format_query_results(raw_data, columns, sql_query, original_query, truncated)
+            logger.info("⭐ _execute_sql_query() - Exit (cached)")
+            return result_text, raw_data
         
         try:
-            with connection.cursor() as cursor:
-                logger.info("⭐ Executing SQL cursor")
-                cursor.execute(sql_query)
-                
-                columns = [desc[0] for desc in cursor.description]
-                raw_data = []
-                formatted_data = []
-                
-                logger.info(f"⭐ Fetching results with {len(columns)} columns: {columns}")
-                for row in cursor.fetchall():
-                    row_dict = {}
-                    formatted_row = {}
-                    for idx, col in enumerate(columns):
-                        value = row[idx]
-                        if value is None:
-                            row_dict[col] = "NULL"
-                            formatted_row[col] = "NULL"
-                        elif hasattr(value, 'isoformat'):
-                            row_dict[col] = value.isoformat()
-                            formatted_row[col] = value.isoformat()
-                        else:
-                            row_dict[col] = str(value)
-                            formatted_row[col] = str(value)
-                    raw_data.append(row_dict)
-                    formatted_data.append(formatted_row)
-                
-                # Format results
-                logger.info("⭐ Formatting query results")
-                result_text = self._format_query_results(formatted_data, columns, sql_query, original_query)
-                logger.info(f"⭐ Query executed successfully, returned {len(raw_data)} rows")
-                return result_text, raw_data
+            # The Databricks driver is fully synchronous - keep it off the event loop
+            query_result = await self._run_database_work(self._run_pooled_query, sql_query)
+            if query_result is None:
+                logger.error("⭐ Database connection not available")
+                return "Database connection not available. Please check Databricks configuration.", None
+            
+            columns, raw_data, truncated = query_result
+            self._store_cached_query(cache_key, columns, raw_data, truncated)
+            
+            # Format results (the formatters only read rows, so the raw rows are shared)
+            logger.info("⭐ Formatting query results")
+            result_text = self._format_query_results(raw_data, columns, sql_query, original_query, truncated)
+            logger.info("⭐ Query executed successfully, returned %s rows", len(raw_data))
+            return result_text, raw_data
                 
         except Exception as e:
-            logger.error(f"💥 Query execution error: {str(e)}")
+            logger.error("💥 Query execution error: %s", e)
+            # Decision: A failing query may mean the data changed underneath - drop its cached result
+            if cache_key is not None:
+                self._query_cache.pop(cache_key, None)
             return f"Query execution failed: {str(e)}", None
             
         finally:
+            logger.info("⭐ _execute_sql_query() - Exit")
+
+    async def _run_blocking(self, func, *args):
+        """Run blocking driver/rendering work on a worker thread so the event loop stays free"""
+        return await asyncio.to_thread(func, *args)
+
+    async def _run_database_work(self, func, *args):
+        """Run blocking Databricks driver work on the dedicated database executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._db_executor, func, *args)
+
+    @contextmanager
+    def _acquire_connection(self):
+        """Check out a pooled Databricks connection and return it to the pool afterwards"""
+        connection = None
+        while connection is None:
+            try:
+                connection, last_used = self._connection_pool.get_nowait()
+            except queue.Empty:
+                connection = self._get_databricks_connection()
+                break
+            
+            # Decision: Health-check long-idle connections; replace any the warehouse has dropped
+            if time.monotonic() - last_used > DATABRICKS_IDLE_CHECK_SECONDS and not self._is_connection_alive(connection):
+                logger.info("⭐ Discarding stale pooled Databricks connection")
+                self._close_connection(connection)
+                connection = None
+            else:
+                logger.info("⭐ Reusing pooled Databricks connection")
+        
+        if connection is None:
+            yield None
+            return
+        
+        try:
+            yield connection
+        except Exception:
+            # Decision: Discard the connection on failure; the next checkout opens a fresh one
+            self._close_connection(connection)
+            raise
+        
+        try:
+            self._connection_pool.put_nowait((connection, time.monotonic()))
+        except queue.Full:
+            self._close_connection(connection)
+
+    def _is_connection_alive(self, connection) -> bool:
+        """Check a pooled connection with a trivial query"""
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+            return True
+        except Exception as e:
+            logger.warning("⭐ Pooled Databricks connection failed health check: %s", e)
+            return False
+
+    def _prewarm_connection_pool(self):
+        """Open the minimum number of pooled connections ahead of the first query"""
+        logger.info("⭐ _prewarm_connection_pool() - Entry")
+        while self._connection_pool.qsize() < DATABRICKS_POOL_MIN_SIZE:
+            connection = self._get_databricks_connection()
+            if connection is None:
+                logger.warning("⭐ Could not pre-warm Databricks connection pool")
+                break
+            try:
+                self._connection_pool.put_nowait((connection, time.monotonic()))
+            except queue.Full:
+                self._close_connection(connection)
+                break
+        logger.info("⭐ _prewarm_connection_pool() - Exit: %s idle connections", self._connection_pool.qsize())
+
+    def _close_connection(self, connection):
+        """Close a Databricks connection, ignoring errors from already-broken sessions"""
+        try:
             connection.close()
             logger.info("⭐ Database connection closed")
-            logger.info("⭐ _execute_sql_query() - Exit")
+        except Exception as e:
+            logger.warning("⭐ Error closing Databricks connection: %s", e)
+
+    def _close_connection_pool(self):
+        """Close every idle pooled connection"""
+        while True:
+            try:
+                connection, _ = self._connection_pool.get_nowait()
+            except queue.Empty:
+                break
+            self._close_connection(connection)
 
+    def _run_pooled_query(self, sql_query: str) -> Optional[Tuple[Tuple[str, ...], List[Dict], bool]]:
+        """Run a query on a pooled connection; None if no connection is available"""
+        with self._acquire_connection() as connection:
+            if connection is None:
+                return None
+            return self._run_query(connection, sql_query)
+
+    def _run_query(self, connection, sql_query: str) -> Tuple[Tuple[str, ...], List[Dict], bool]:
+        """Run the blocking cursor work for a query (called from a worker thread); the flag marks a truncated result"""
+        with connection.cursor() as cursor:
+            logger.info("⭐ Executing SQL cursor")
+            cursor.execute(sql_query)
+            
+            # Decision: Always read names from this cursor - a same-shape query can still return different columns
+            columns = tuple(desc[0] for desc in cursor.description)
+            
+            logger.info("⭐ Fetching results with %s columns: %s", len(columns), columns)
+            if ARROW_AVAILABLE and hasattr(cursor, "fetchmany_arrow"):
+                logger.info("⭐ Decision: Using Arrow columnar result handling")
+                table = cursor.fetchmany_arrow(MAX_RESULT_ROWS + 1)
+                truncated = self._check_truncated(table.num_rows)
+                raw_data = self._arrow_to_rows(table.slice(0, MAX_RESULT_ROWS))
+                return columns, raw_data, truncated
+            
+            # Decision: Never materialize more than MAX_RESULT_ROWS, even for queries without a LIMIT
+            # (one extra row is fetched only to tell a complete result from a truncated one)
+            cursor.arraysize = MAX_RESULT_ROWS + 1
+            rows = cursor.fetchmany(MAX_RESULT_ROWS + 1)
+            truncated = self._check_truncated(len(rows))
+            rows = rows[:MAX_RESULT_ROWS]
+            column_converters = list(zip(columns, self._build_row_converters(cursor.description, rows[0]))) if rows else []
+            raw_data = [
+                {col: convert(value) for (col, convert), value in zip(column_converters, row)}
+                for row in rows
+            ]
+            
+            return columns, raw_data, truncated
+
+
+    def _check_truncated(self, fetched_count: int) -> bool:
+        """Report (and warn) whether a fetch of MAX_RESULT_ROWS + 1 rows hit the cap"""
+        if fetched_count > MAX_RESULT_ROWS:
+            logger.warning("⭐ Result truncated to the first %s rows", MAX_RESULT_ROWS)
+            return True
+        return False
+
+    def _build_row_converters(self, description, first_row) -> List[Callable[[Any], str]]:
+        """Pick a per-column cell converter from the column type codes, falling back to first-row values"""
+        converters = []
+        for column_info, value in zip(description, first_row):
+            type_code = str(column_info[1]).lower() if len(column_info) > 1 and column_info[1] else ""
+            if type_code in TEMPORAL_TYPE_CODES:
+                converters.append(_null_or_iso)
+            elif type_code in NON_TEMPORAL_TYPE_CODES:
+                converters.append(_null_or_str)
+            elif value is None:
+                # Decision: Type unknown from this row, keep the fully general converter
+                converters.append(_convert_cell)
+            elif hasattr(value, 'isoformat'):
+                converters.append(_null_or_iso)
+            else:
+                converters.append(_null_or_str)
+        return converters
+
+    def _arrow_to_rows(self, table) -> List[Dict]:
+        """Stringify an Arrow result column by column and return it as row dicts"""
+        string_columns = []
+        for column in table.columns:
+            column_type = column.type
+            if pa.types.is_timestamp(column_type) and column_type.tz:
+                # Decision: Timezone-aware values go through isoformat() so the UTC offset is kept, as on the row path
+                column = pa.array([None if value is None else value.isoformat() for value in column.to_pylist()], type=pa.string())
+            elif pa.types.is_timestamp(column_type):
+                # Arrow's %S carries fractional seconds; drop them when zero to match isoformat()
+                column = pc.replace_substring_regex(
+                    pc.strftime(column, format="%Y-%m-%dT%H:%M:%S"), pattern=r"\.0+$", replacement=""
+                )
+            elif pa.types.is_integer(column_type) or pa.types.is_date(column_type) or pa.types.is_decimal(column_type):
+                column = pc.cast(column, pa.string())
+            elif not (pa.types.is_string(column_type) or pa.types.is_large_string(column_type)):
+                # Floats, booleans and nested types keep Python's str() rendering
+                column = pa.array([None if value is None else str(value) for value in column.to_pylist()], type=pa.string())
+            string_columns.append(pc.fill_null(column, "NULL"))
+        return pa.Table.from_arrays(string_columns, names=table.column_names).to_pylist()
+
+    def _query_cache_key(self, normalized_sql: str) -> Optional[bytes]:
+        """Hash normalized SQL and the schema version into a cache key, or None if the query must not be cached"""
+        if any(token in normalized_sql for token in NON_DETERMINISTIC_SQL_TOKENS):
+            logger.info("⭐ Decision: Non-deterministic SQL, skipping result cache")
+            return None
+        # Decision: Include the schema version so results never outlive a table change
+        keyed = f"{config.DATABRICKS_SCHEMA_VERSION}\x00{normalized_sql}"
+        return hashlib.blake2b(keyed.encode("utf-8"), digest_size=16).digest()
 
-    def _format_query_results(self, data: list, columns: list, sql_query: str, original_query: str) -> str:
+    def _get_cached_query(self, cache_key: Optional[bytes]) -> Optional[Tuple[List[str], List[Dict], bool]]:
+        """Return cached (columns, rows, truncated) for a key if present and still fresh"""
+        if cache_key is None:
+            return None
+        entry = self._query_cache.get(cache_key)
+        if entry is None:
+            return None
+        cached_at, columns, raw_data, truncated = entry
+        if time.monotonic() - cached_at >= self._query_cache_ttl:
+            del self._query_cache[cache_key]
+            return None
+        self._query_cache.move_to_end(cache_key)
+        return columns, raw_data, truncated
+
+    def _store_cached_query(self, cache_key: Optional[bytes], columns: List[str], raw_data: List[Dict], truncated: bool = False):
+        """Store query rows in the result cache, evicting the oldest entries"""
+        if cache_key is None or self._query_cache_ttl <= 0:
+            return
+        self._query_cache[cache_key] = (time.monotonic(), columns, raw_data, truncated)
+        self._query_cache.move_to_end(cache_key)
+        while len(self._query_cache) > QUERY_CACHE_MAX_ENTRIES:
+            self._query_cache.popitem(last=False)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Report sizes and hit rates of the plugin's caches"""
+        return {
+            "query_results": {"entries": len(self._query_cache)},
+            "explanations": self._explain_cache.stats,
+            "semantic_explanations": self._semantic_cache.stats
+        }
+
+    def clear_query_cache(self):
+        """Drop all cached query results"""
+        logger.info("⭐ Clearing query result cache (%s entries)", len(self._query_cache))
+        self._query_cache.clear()
+
+    def _format_query_results(self, data: list, columns: list, sql_query: str, original_query: str, truncated: bool = False) -> str:
         """Format query results intelligently"""
-        logger.info(f"⭐ _format_query_results() - Entry: {len(data)} rows")
+        logger.info("⭐ _format_query_results() - Entry: %s rows", len(data))
         
         if not data:
             logger.info("⭐ No data found for query")
             return f"No results found for: '{original_query}'\n\nQuery: {sql_query}"
         
-        result = f"Query Results ({len(data)} row{'s' if len(data) != 1 else ''}):\n\n"
+        if truncated:
+            # Decision: Say so explicitly - totals and counts computed from these rows would be incomplete
+            parts = [f"Query Results (showing first {len(data)} rows; result truncated, more rows exist):\n\n"]
+        else:
+            parts = [f"Query Results ({len(data)} row{'s' if len(data) != 1 else ''}):\n\n"]
         
         # Decision: Format based on data size
         if len(data) <= 5 and len(columns) <= 8:
             logger.info("⭐ Decision: Using detailed table format")
-            result += self._format_detailed_table(data, columns)
+            parts.append(self._format_detailed_table(data, columns))
         else:
             logger.info("⭐ Decision: Using compact table format")
-            result += self._format_compact_table(data, columns)
+            parts.append(self._format_compact_table(data, columns))
         
         # Add query context
-        result += f"\nGenerated from: '{original_query}'\n"
-        result += f"SQL: {sql_query}\n"
+        parts.append(f"\nGenerated from: '{original_query}'\n")
+        parts.append(f"SQL: {sql_query}\n")
+        result = "".join(parts)
         
         logger.info("⭐ Query results formatted successfully")
         logger.info("⭐ _format_query_results() - Exit")
@@ -261,18 +813,37 @@ class TradingPlugin(BasePlugin):
     def _format_detailed_table(self, data: list, columns: list) -> str:
         """Format data as a detailed table"""
         logger.info("⭐ _format_detailed_table() - Entry")
-        result = ""
+        row_template = self._get_row_template(columns)
+        parts = []
         for i, row in enumerate(data, 1):
-            result += f"**Row {i}:**\n"
+            values = []
             for col in columns:
                 value = row.get(col, "N/A")
-                if value and len(str(value)) > 100:
-                    value = str(value)[:100] + "..."
-                result += f"  • {col}: {value}\n"
-            result += "\n"
+                # Cells are already rendered as text; only stringify anything that is not
+                if not isinstance(value, str):
+                    value = str(value)
+                if len(value) > 100:
+                    value = value[:100] + "..."
+                values.append(value)
+            parts.append(f"**Row {i}:**\n")
+            parts.append(row_template.format(*values))
         logger.info("⭐ Detailed table formatted")
         logger.info("⭐ _format_detailed_table() - Exit")
-        return result
+        return "".join(parts)
+
+    def _get_row_template(self, columns: list) -> str:
+        """Get (or build once) the detailed-row format template for a column layout"""
+        key = tuple(columns)
+        template = self._row_templates.get(key)
+        if template is None:
+            # Column names are baked in, so escape any braces before adding the value slots
+            template = "".join(
+                f"  • {col.replace('{', '{{').replace('}', '}}')}: {{}}\n" for col in columns
+            ) + "\n"
+            self._row_templates[key] = template
+            if len(self._row_templates) > QUERY_CACHE_MAX_ENTRIES:
+                self._row_templates.popitem(last=False)
+        return template
 
     def _format_compact_table(self, data: list, columns: list) -> str:
         """Format data as a compact table"""
@@ -280,50 +851,67 @@ class TradingPlugin(BasePlugin):
         
         # Decision: Select key columns for display
         key_columns = self._get_key_columns(columns)
-        logger.info(f"⭐ Selected key columns: {key_columns}")
+        logger.info("⭐ Selected key columns: %s", key_columns)
         
         # Create header
         headers = ["#"] + key_columns
         header_line = "| " + " | ".join(headers) + " |"
         separator = "|" + "|".join(["---" for _ in headers]) + "|"
         
-        result = header_line + "\n" + separator + "\n"
+        parts = [f"{header_line}\n{separator}\n"]
         
-        # Add rows
-        for i, row in enumerate(data, 1):
+        # Add rows (only the preview; the rest is summarized below)
+        for i, row in enumerate(data[:RESULT_PREVIEW_ROWS], 1):
             row_values = [str(i)]
             for col in key_columns:
                 value = row.get(col, "N/A")
-                if value and len(str(value)) > 25:
-                    value = str(value)[:22] + "..."
-                row_values.append(str(value))
-            result += "| " + " | ".join(row_values) + " |\n"
+                if not isinstance(value, str):
+                    value = str(value)
+                row_values.append(value if len(value) <= 25 else value[:22] + "...")
+            parts.append(f"| {' | '.join(row_values)} |\n")
+        
+        # Decision: Summarize rows beyond the preview instead of rendering them
+        remaining = len(data) - RESULT_PREVIEW_ROWS
+        if remaining > 0:
+            logger.info("⭐ Compact table truncated to %s rows, %s more", RESULT_PREVIEW_ROWS, remaining)
+            parts.append(f"\n... and {remaining} more row{'s' if remaining != 1 else ''}\n")
         
         logger.info("⭐ Compact table formatted")
         logger.info("⭐ _format_compact_table() - Exit")
-        return result
+        return "".join(parts)
 
     def _get_key_columns(self, all_columns: list) -> list:
-        """Identify key columns to display"""
-        logger.info(f"⭐ _get_key_columns() - Entry: {all_columns}")
+        """Identify key columns to display (memoized per column layout; callers must not mutate the list)"""
+        logger.info("⭐ _get_key_columns() - Entry: %s", all_columns)
+        
+        # Decision: The same query shape always selects the same columns - reuse the last selection
+        layout = tuple(all_columns)
+        key_columns = self._key_columns_cache.get(layout)
+        if key_columns is not None:
+            self._key_columns_cache.move_to_end(layout)
+            logger.info("⭐ _get_key_columns() - Exit (cached)")
+            return key_columns
         
-        key_columns = []
-        priority_columns = [
-            'deal_num', 'tran_num', 'trade_date', 'currency', 'amount', 
-            'volume', 'price', 'trader', 'buy_sell', 'status'
-        ]
+        available = set(all_columns)
         
         # Decision: Add priority columns that exist
-        for col in priority_columns:
-            if col in all_columns:
-                key_columns.append(col)
+        key_columns = [col for col in PRIORITY_COLUMNS if col in available]
         
         # Decision: Fill remaining slots
-        if len(key_columns) < 6:
-            additional_cols = [col for col in all_columns if col not in key_columns]
-            key_columns.extend(additional_cols[:6 - len(key_columns)])
+        if len(key_columns) < MAX_KEY_COLUMNS:
+            selected = set(key_columns)
+            for col in all_columns:
+                if len(key_columns) >= MAX_KEY_COLUMNS:
+                    break
+                if col not in selected:
+                    key_columns.append(col)
+                    selected.add(col)
         
-        logger.info(f"⭐ Final key columns selected: {key_columns}")
+        self._key_columns_cache[layout] = key_columns
+        if len(self._key_columns_cache) > QUERY_CACHE_MAX_ENTRIES:
+            self._key_columns_cache.popitem(last=False)
+        
+        logger.info("⭐ Final key columns selected: %s", key_columns)
         logger.info("⭐ _get_key_columns() - Exit")
         return key_columns
 
@@ -334,59 +922,55 @@ class TradingPlugin(BasePlugin):
     )
     async def explain_concept(self, concept: str) -> str:
         """Explain trading concepts using LLM"""
-        logger.info(f"⭐ explain_concept() - Entry: '{concept}'")
+        logger.info("⭐ explain_concept() - Entry: '%s'", concept)
         
         try:
-            logger.info(f"⭐ Explaining concept: {concept}")
+            logger.info("⭐ Explaining concept: %s", concept)
+            
+            concept_key = self._normalize_concept(concept)
+            cache_key = self._explanation_cache_key(concept_key)
+            concept_embedding = None
+            if self._cache_explanations:
+                # Decision: Standard trading terms are stable - serve repeats from the explanation cache
+                cached_explanation = self._explain_cache.get(cache_key)
+                if cached_explanation is not None:
+                    logger.info("⭐ Concept explanation cache hit")
+                    return f"**Explanation of '{concept}':**\n\n{cached_explanation}"
+                
+                # Decision: Fall back to a semantically similar concept explained before
+                concept_embedding = await self._embed_concept(concept_key)
+                if concept_embedding is not None:
+                    similar_explanation = self._semantic_cache.lookup(concept_embedding)
+                    if similar_explanation is not None:
+                        return f"**Explanation of '{concept}':**\n\n{similar_explanation}"
             
             if not self.chat_service:
                 logger.error("⭐ LLM service not available")
                 return "LLM service not available. Please check Azure OpenAI configuration."
             
-            explanation_prompt = f"""
-            Please provide a clear, comprehensive explanation of '{concept}' in the context of trading and finance.
-            
-            Your explanation should include:
-            1. A simple and clear definition
-            2. How it works in practical trading scenarios
-            3. Why it's important in financial markets
-            4. Real-world examples or use cases
-            5. Any related concepts or terminology
-            
-            Make it professional yet accessible.
-            """
+            explanation_prompt = EXPLAIN_PROMPT_TEMPLATE.format(concept=concept)
             
             # Create chat history
-            from semantic_kernel.contents import ChatHistory
-            from semantic_kernel.connectors.ai.open_ai import OpenAIChatPromptExecutionSettings
-            
-            chat_history = ChatHistory()
-            chat_history.add_system_message("You are a helpful trading assistant that provides clear explanations.")
+            chat_history = ChatHistory(messages=list(self._explain_history_template.messages))
             chat_history.add_user_message(explanation_prompt)
             
-            # Create settings
-            settings = OpenAIChatPromptExecutionSettings(
-                service_id="azure_gpt4o",
-                max_tokens=1000,
-                temperature=0.7
-            )
-            
             # Generate response
             logger.info("⭐ Generating LLM response for concept explanation")
-            result = await self.chat_service.get_chat_message_contents(
-                chat_history=chat_history,
-                settings=settings
-            )
+            explanation = await self._submit_llm(cache_key, chat_history, self._explain_settings)
             
-            if result and len(result) > 0:
+            if explanation is not None:
                 logger.info("⭐ Concept explanation generated successfully")
-                return f"**Explanation of '{concept}':**\n\n{result[0].content}"
+                if self._cache_explanations:
+                    self._explain_cache.set(cache_key, explanation)
+                if concept_embedding is not None:
+                    self._semantic_cache.put(concept_embedding, concept_key, explanation)
+                return f"**Explanation of '{concept}':**\n\n{explanation}"
             
             logger.warning("⭐ Could not generate explanation")
             return f"Could not generate explanation for '{concept}'."
             
         except Exception as e:
-            logger.error(f"💥 Error explaining concept: {str(e)}")
+            logger.error("💥 Error explaining concept: %s", e)
             return f"I apologize, but I encountered an error while explaining '{concept}': {str(e)}"
         finally:
             logger.info("⭐ explain_concept() - Exit")
@@ -398,10 +982,10 @@ class TradingPlugin(BasePlugin):
     )
     async def execute_custom_query(self, sql_query: str) -> str:
         """Execute custom SQL query"""
-        logger.info(f"⭐ execute_custom_query() - Entry: {sql_query[:100]}...")
+        logger.info("⭐ execute_custom_query() - Entry: %s...", sql_query[:100])
         
         try:
-            logger.info(f"⭐ Executing custom SQL: {sql_query[:100]}...")
+            logger.info("⭐ Executing custom SQL: %s...", sql_query[:100])
             
             if not self._validate_sql_query(sql_query):
                 logger.warning("⭐ SQL query validation failed")
@@ -420,22 +1004,24 @@ class TradingPlugin(BasePlugin):
 
     def _validate_sql_query(self, sql_query: str) -> bool:
         """Validate SQL query for safety"""
-        logger.info(f"⭐ _validate_sql_query() - Entry: {sql_query[:50]}...")
+        logger.info("⭐ _validate_sql_query() - Entry: %s...", sql_query[:50])
         
-        sql_lower = sql_query.lower().strip()
+        # Decision: Prefer a real parse - ignores keywords in literals/comments and rejects stacked statements
+        if SQLGLOT_AVAILABLE:
+            if not _is_read_only_statement(sql_query):
+                logger.warning("⭐ SQL validation failed: not a single read-only SELECT/WITH statement")
+                return False
+            logger.info("⭐ SQL validation passed")
+            logger.info("⭐ _validate_sql_query() - Exit")
+            return True
         
-        destructive_keywords = [
-            "drop", "delete", "update", "insert", "alter", "truncate", 
-            "create", "modify", "grant", "revoke"
-        ]
-        
-        # Decision: Check for destructive keywords
-        if any(keyword in sql_lower for keyword in destructive_keywords):
+        # Decision: Check for destructive keywords (whole words outside literals, so e.g. 'updated_at' is allowed)
+        if _DESTRUCTIVE_SQL_RE.search(strip_sql_literals(sql_query)):
             logger.warning("⭐ SQL validation failed: destructive keywords found")
             return False
         
         # Decision: Only allow SELECT or WITH queries
-        if not (sql_lower.startswith('select') or sql_lower.startswith('with')):
+        if not _READ_ONLY_SQL_LEAD_RE.match(sql_query):
             logger.warning("⭐ SQL validation failed: not a SELECT or WITH query")
             return False
         
@@ -444,40 +1030,36 @@ class TradingPlugin(BasePlugin):
         return True
 
 
-    async def _generate_visualization_if_needed(self, query: str, raw_data: List[Dict]) -> Optional[Dict]:
-        """Generate visualization if the query suggests charting is needed"""
-        logger.info(f"⭐ _generate_visualization_if_needed() - Entry: '{query[:50]}...' with {len(raw_data)} rows")
+    def _should_visualize(self, query: str) -> bool:
+        """Check whether the query asks for a chart, based on its keywords"""
+        words = _WORD_RE.findall(query.lower())
+        visualization_requested = not VISUALIZATION_KEYWORDS.isdisjoint(words) or any(
+            pair in VISUALIZATION_PHRASES for pair in zip(words, words[1:])
+        )
+        if not visualization_requested:
+            logger.info("⭐ Decision: Visualization not requested based on query keywords")
+        return visualization_requested
+
+    async def _generate_visualization(self, query: str, raw_data: List[Dict]) -> Optional[Dict]:
+        """Render a chart for query results (callers check _should_visualize first)"""
+        logger.info("⭐ _generate_visualization() - Entry: '%s...' with %s rows", query[:50], len(raw_data))
         
         try:
-            # Decision: Check if visualization is appropriate based on query keywords
-            query_lower = query.lower()
-            visualization_keywords = [
-                "chart", "graph", "plot", "visualize", "show me",
-                "trend", "distribution", "percentage", "compare",
-                "top", "best", "worst", "ranking", "analyze",
-                "histogram", "bar chart", "line chart", "pie chart"
-            ]
-            
-            visualization_requested = any(keyword in query_lower for keyword in visualization_keywords)
-            
-            if not visualization_requested:
-                logger.info("⭐ Decision: Visualization not requested based on query keywords")
-                return None
-            
-            # Import visualization service
-            try:
-                from app.utils.visualization_service import visualization_service
-            except ImportError as e:
-                logger.warning(f"⭐ Visualization service not available: {e}")
-                return None
-            
             if not raw_data:
                 logger.warning("⭐ No raw data available for visualization")
                 return None
             
+            # The first call pays the pandas/matplotlib import, so keep it off the event loop
+            visualization_service = await self._run_blocking(_get_visualization_service)
+            if visualization_service is None:
+                logger.warning("⭐ Visualization service not available")
+                return None
+            
             # Generate visualization
             logger.info("⭐ Generating visualization with raw data")
-            chart_data = visualization_service.generate_chart(raw_data, query, f"Visualization: {query}")
+            chart_data = await self._run_blocking(
+                visualization_service.generate_chart, raw_data, query, f"Visualization: {query}"
+            )
             
             if chart_data:
                 logger.info("⭐ Visualization generated successfully")
@@ -487,20 +1069,33 @@ class TradingPlugin(BasePlugin):
                 return None
                 
         except Exception as e:
-            logger.error(f"💥 Error in visualization generation: {str(e)}")
+            logger.error("💥 Error in visualization generation: %s", e)
             return None
         finally:
-            logger.info("⭐ _generate_visualization_if_needed() - Exit")
+            logger.info("⭐ _generate_visualization() - Exit")
 
 
     async def cleanup(self):
         """Cleanup resources"""
+        global _AZURE_CHAT_SERVICE, _AZURE_CHAT_SERVICE_CLIENT
         logger.info("⭐ TradingPlugin.cleanup() - Entry")
         try:
+            # The pooled client is closed right after agent cleanup; never hand this service out again
+            _AZURE_CHAT_SERVICE = None
+            _AZURE_CHAT_SERVICE_CLIENT = None
+            self.chat_service = None
             self.conversations.clear()
             logger.info("⭐ Conversations cleared")
+            self.clear_query_cache()
+            self._explain_cache.clear()
+            self._semantic_cache.clear()
+            if self._batch_embedder:
+                await self._batch_embedder.close()
+            await self._run_database_work(self._close_connection_pool)
+            self._db_executor.shutdown(wait=False)
+            logger.info("⭐ Databricks connection pool closed")
         except Exception as e:
-            logger.error(f"💥 Error during cleanup: {str(e)}")
+            logger.error("💥 Error during cleanup: %s", e)
         finally:
             logger.info("⭐ TradingPlugin.cleanup() - Exit")
 
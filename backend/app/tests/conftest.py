@@ -0,0 +1,61 @@
+# backend/app/tests/conftest.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.tests.fakes import FakeDatabricksConnection
+
+
+class FakeClock:
+    """Manually advanced stand-in for time.monotonic"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def fake_clock():
+    """A FakeClock starting at t=1000s; advance it by adding to .now"""
+    return FakeClock()
+
+
+@pytest.fixture
+def patch_monotonic(monkeypatch, fake_clock):
+    """Point a module's `time` reference at the fake clock: patch_monotonic(module) -> clock"""
+    def patch(module):
+        monkeypatch.setattr(module, "time", SimpleNamespace(monotonic=fake_clock))
+        return fake_clock
+    return patch
+
+
+@pytest.fixture
+def db_plugin(monkeypatch):
+    """TradingPlugin whose new connections are FakeDatabricksConnections, listed in db_plugin.opened"""
+    pytest.importorskip("semantic_kernel")
+    from app.plugins.trading_plugin import TradingPlugin
+
+    plugin = TradingPlugin(None)
+    plugin.opened = []
+
+    def connect():
+        connection = FakeDatabricksConnection()
+        plugin.opened.append(connection)
+        return connection
+
+    monkeypatch.setattr(plugin, "_get_databricks_connection", connect)
+    yield plugin
+    plugin._db_executor.shutdown(wait=False)
+
+
+@pytest.fixture
+def run_queries():
+    """Run SQL through a plugin's cached, pooled execution path: run_queries(plugin, *sql) -> [(text, rows)]"""
+    def run(plugin, *sql_queries):
+        async def scenario():
+            return [await plugin._execute_sql_query(sql_query) for sql_query in sql_queries]
+        return asyncio.run(scenario())
+    return run
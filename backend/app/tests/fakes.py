@@ -0,0 +1,44 @@
+# backend/app/tests/fakes.py
+"""Stand-ins for external services, shared by the unit tests"""
+
+
+class FakeDatabricksCursor:
+    """DB-API cursor stand-in serving its connection's fixed result"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.description = connection.description
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, sql_query):
+        if not self.connection.alive:
+            raise ConnectionError("session expired")
+        self.connection.executed.append(sql_query)
+
+    def fetchmany(self, size):
+        return self.connection.rows[:size]
+
+    def fetchall(self):
+        return list(self.connection.rows)
+
+
+class FakeDatabricksConnection:
+    """Databricks connection stand-in recording executed SQL and close()"""
+
+    def __init__(self, alive: bool = True, rows=None, description=(("trade_id", "int"),)):
+        self.alive = alive
+        self.rows = [(1,), (2,)] if rows is None else rows
+        self.description = description
+        self.closed = False
+        self.executed = []
+
+    def cursor(self):
+        return FakeDatabricksCursor(self)
+
+    def close(self):
+        self.closed = True
@@ -0,0 +1,106 @@
+# backend/app/tests/test_agent_cleanup.py
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("semantic_kernel")
+
+from app.agents.base_agent import BaseAgent
+from app.plugins import trading_plugin
+from app.plugins.trading_plugin import TradingPlugin
+from app.tests.fakes import FakeDatabricksConnection
+from app.utils.batch_embedder import BatchEmbedder
+
+
+class FakeEmbeddingService:
+    """Embedding service stand-in returning one-dimensional vectors"""
+
+    async def generate_embeddings(self, texts):
+        return [[float(len(text))] for text in texts]
+
+
+class PluginHostAgent(BaseAgent):
+    """Minimal agent that only hosts the plugins it is given"""
+
+    def __init__(self, plugins):
+        super().__init__(None, "test_agent", "Hosts plugins for cleanup tests")
+        for plugin in plugins:
+            self.add_plugin(plugin)
+
+    async def initialize(self):
+        pass
+
+    async def process_request(self, prompt: str, context: dict = None):
+        return prompt
+
+
+def make_plugin_with_pool(connection_count: int = 2):
+    """TradingPlugin with fake idle connections in its pool"""
+    plugin = TradingPlugin(None)
+    connections = [FakeDatabricksConnection() for _ in range(connection_count)]
+    for connection in connections:
+        plugin._connection_pool.put_nowait((connection, time.monotonic()))
+    return plugin, connections
+
+
+async def start_batch_embedder(plugin: TradingPlugin) -> BatchEmbedder:
+    """Attach a BatchEmbedder and run one embedding so its worker task is live"""
+    plugin._batch_embedder = BatchEmbedder(FakeEmbeddingService(), max_wait_seconds=0)
+    assert await plugin._batch_embedder.embed("swap") == [4.0]
+    return plugin._batch_embedder
+
+
+def assert_released(plugin: TradingPlugin, connections, worker):
+    """The pool is drained, every connection closed, the executor and embedder stopped"""
+    assert plugin._connection_pool.empty()
+    assert all(connection.closed for connection in connections)
+    assert plugin._db_executor._shutdown
+    assert worker.done()
+    assert plugin.chat_service is None
+    assert trading_plugin._AZURE_CHAT_SERVICE is None
+
+
+def test_agent_cleanup_releases_plugin_resources():
+    async def scenario():
+        plugin, connections = make_plugin_with_pool()
+        embedder = await start_batch_embedder(plugin)
+        worker = embedder._worker
+        trading_plugin._AZURE_CHAT_SERVICE = object()
+
+        await PluginHostAgent([plugin]).cleanup()
+        assert_released(plugin, connections, worker)
+
+    asyncio.run(scenario())
+
+
+def test_lifespan_shutdown_cleans_up_agent_plugins(monkeypatch):
+    pytest.importorskip("fastapi")
+    from app import main
+
+    plugin, connections = make_plugin_with_pool()
+    agent = PluginHostAgent([plugin])
+
+    class SingleAgentRegistry:
+        @staticmethod
+        def list_agents():
+            return ["trading"]
+
+        @staticmethod
+        def get_agent(agent_name, kernel):
+            return agent
+
+    async def close_client():
+        pass
+
+    monkeypatch.setattr(main, "create_kernel", lambda: None)
+    monkeypatch.setattr(main, "AgentRegistry", SingleAgentRegistry)
+    monkeypatch.setattr(main, "close_azure_openai_client", close_client)
+
+    async def scenario():
+        async with main.lifespan(main.app):
+            assert main.app.state.agent_registry == {"trading": agent}
+            worker = (await start_batch_embedder(plugin))._worker
+        assert_released(plugin, connections, worker)
+
+    asyncio.run(scenario())
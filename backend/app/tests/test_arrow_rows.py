@@ -0,0 +1,63 @@
+# backend/app/tests/test_arrow_rows.py
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("semantic_kernel")
+pa = pytest.importorskip("pyarrow", exc_type=ImportError)
+
+from app.plugins.trading_plugin import TradingPlugin
+
+
+@pytest.fixture
+def plugin():
+    plugin = TradingPlugin(None)
+    yield plugin
+    plugin._db_executor.shutdown(wait=False)
+
+
+def test_columns_are_stringified_like_the_row_path(plugin):
+    table = pa.table({
+        "deal_num": pa.array([7, None], type=pa.int64()),
+        "trade_date": pa.array([date(2024, 3, 1), date(2024, 3, 2)]),
+        "amount": pa.array([Decimal("12.50"), Decimal("-3.00")], type=pa.decimal128(10, 2)),
+        "price": pa.array([1.5, 2.0]),
+        "is_active": pa.array([True, False]),
+        "trader": pa.array(["ann", None]),
+    })
+
+    assert plugin._arrow_to_rows(table) == [
+        {"deal_num": "7", "trade_date": "2024-03-01", "amount": "12.50",
+         "price": "1.5", "is_active": "True", "trader": "ann"},
+        {"deal_num": "NULL", "trade_date": "2024-03-02", "amount": "-3.00",
+         "price": "2.0", "is_active": "False", "trader": "NULL"},
+    ]
+
+
+def test_naive_timestamps_match_isoformat(plugin):
+    values = [datetime(2024, 3, 1, 9, 30), datetime(2024, 3, 1, 9, 30, 15, 250000), None]
+    table = pa.table({"booked_at": pa.array(values, type=pa.timestamp("us"))})
+
+    assert plugin._arrow_to_rows(table) == [
+        {"booked_at": "2024-03-01T09:30:00"},
+        {"booked_at": "2024-03-01T09:30:15.250000"},
+        {"booked_at": "NULL"},
+    ]
+
+
+def test_timezone_aware_timestamps_keep_their_offset(plugin):
+    value = datetime(2024, 3, 1, 9, 30, tzinfo=timezone.utc)
+    table = pa.table({"booked_at": pa.array([value, None], type=pa.timestamp("us", tz="UTC"))})
+
+    rows = plugin._arrow_to_rows(table)
+
+    assert rows == [{"booked_at": value.isoformat()}, {"booked_at": "NULL"}]
+    assert rows[0]["booked_at"].endswith("+00:00")
+
+
+def test_non_utc_zone_keeps_its_local_offset(plugin):
+    value = datetime(2024, 3, 1, 9, 30, tzinfo=timezone(timedelta(hours=5, minutes=30)))
+    table = pa.table({"booked_at": pa.array([value], type=pa.timestamp("us", tz="+05:30"))})
+
+    assert plugin._arrow_to_rows(table) == [{"booked_at": "2024-03-01T09:30:00+05:30"}]
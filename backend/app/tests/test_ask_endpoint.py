@@ -0,0 +1,116 @@
+# backend/app/tests/test_ask_endpoint.py
+import asyncio
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("semantic_kernel")
+
+from fastapi import HTTPException
+
+from app import main
+from app.main import AskRequest
+from app.utils.llm_cache import LLMCache
+
+
+class GatedTradingAgent:
+    """Trading agent stand-in whose turns wait until the test opens the gate"""
+
+    def __init__(self):
+        self.prompts = []
+        self.gate = asyncio.Event()
+
+    async def process_request(self, prompt: str, context: dict = None):
+        self.prompts.append(prompt)
+        await self.gate.wait()
+        return f"answer to {prompt}"
+
+
+def make_http_request(agent):
+    """Request stand-in carrying the app state the lifespan would set up"""
+    state = SimpleNamespace(
+        agent_registry={"trading": agent},
+        response_cache=LLMCache(max_entries=10, ttl_seconds=60),
+        inflight_asks={}
+    )
+    return SimpleNamespace(app=SimpleNamespace(state=state), headers={})
+
+
+async def ask(http_request, prompt: str):
+    """Call /ask and return the decoded JSON body"""
+    response = await main.ask_agent(AskRequest(prompt=prompt), http_request)
+    return orjson.loads(response.body)
+
+
+def test_concurrent_identical_prompts_share_one_agent_turn():
+    async def scenario():
+        agent = GatedTradingAgent()
+        http_request = make_http_request(agent)
+        asks = asyncio.gather(
+            ask(http_request, "What is a swap?"),
+            ask(http_request, "What is  a swap?"),
+            ask(http_request, "What is a future?")
+        )
+        await asyncio.sleep(0)
+        assert len(http_request.app.state.inflight_asks) == 2
+        agent.gate.set()
+        bodies = await asks
+
+        assert agent.prompts == ["What is a swap?", "What is a future?"]
+        assert [body["response"] for body in bodies] == [
+            "answer to What is a swap?", "answer to What is a swap?", "answer to What is a future?"
+        ]
+        assert http_request.app.state.inflight_asks == {}
+
+        # The shared answer is now cached, so a repeat does not reach the agent
+        assert (await ask(http_request, "What is a swap?"))["status"] == "success"
+        assert len(agent.prompts) == 2
+
+    asyncio.run(scenario())
+
+
+def test_one_disconnecting_client_does_not_cancel_the_shared_turn():
+    async def scenario():
+        agent = GatedTradingAgent()
+        http_request = make_http_request(agent)
+        first = asyncio.ensure_future(ask(http_request, "What is a swap?"))
+        second = asyncio.ensure_future(ask(http_request, "What is a swap?"))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        agent.gate.set()
+
+        assert (await second)["response"] == "answer to What is a swap?"
+        assert first.cancelled()
+        assert agent.prompts == ["What is a swap?"]
+
+    asyncio.run(scenario())
+
+
+def test_stalled_agent_turn_times_out_with_504(monkeypatch):
+    monkeypatch.setenv("LLM_TIMEOUT", "0.01")
+
+    async def scenario():
+        agent = GatedTradingAgent()
+        http_request = make_http_request(agent)
+        with pytest.raises(HTTPException) as raised:
+            await ask(http_request, "What is a swap?")
+
+        assert raised.value.status_code == 504
+        assert "0.01 seconds" in raised.value.detail
+        assert http_request.app.state.inflight_asks == {}
+        assert http_request.app.state.response_cache.stats["entries"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_missing_trading_agent_is_503():
+    async def scenario():
+        http_request = make_http_request(None)
+        with pytest.raises(HTTPException) as raised:
+            await ask(http_request, "What is a swap?")
+        assert raised.value.status_code == 503
+
+    asyncio.run(scenario())
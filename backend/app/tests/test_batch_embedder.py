@@ -0,0 +1,81 @@
+# backend/app/tests/test_batch_embedder.py
+import asyncio
+
+from app.utils.batch_embedder import BatchEmbedder
+
+
+class RecordingEmbeddingService:
+    """Embedding service stand-in that records each batch it is sent"""
+
+    def __init__(self, error: Exception = None):
+        self.batches = []
+        self.error = error
+
+    async def generate_embeddings(self, texts):
+        self.batches.append(list(texts))
+        if self.error is not None:
+            raise self.error
+        return [[float(len(text))] for text in texts]
+
+
+def test_concurrent_requests_share_one_embedding_call():
+    service = RecordingEmbeddingService()
+    embedder = BatchEmbedder(service, max_batch_size=16, max_wait_seconds=0.05)
+
+    async def scenario():
+        embeddings = await asyncio.gather(*(embedder.embed(text) for text in ("swap", "future", "option")))
+        await embedder.close()
+        return embeddings
+
+    assert asyncio.run(scenario()) == [[4.0], [6.0], [6.0]]
+    assert service.batches == [["swap", "future", "option"]]
+
+
+def test_batches_are_capped_at_max_batch_size():
+    service = RecordingEmbeddingService()
+    embedder = BatchEmbedder(service, max_batch_size=2, max_wait_seconds=0.05)
+
+    async def scenario():
+        embeddings = await asyncio.gather(*(embedder.embed(text) for text in ("a", "bb", "ccc", "dddd", "eeeee")))
+        await embedder.close()
+        return embeddings
+
+    assert asyncio.run(scenario()) == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+    assert service.batches == [["a", "bb"], ["ccc", "dddd"], ["eeeee"]]
+
+
+def test_failed_batch_raises_for_every_caller_and_worker_keeps_running():
+    service = RecordingEmbeddingService(error=RuntimeError("rate limited"))
+    embedder = BatchEmbedder(service, max_wait_seconds=0.05)
+
+    async def scenario():
+        results = await asyncio.gather(embedder.embed("swap"), embedder.embed("future"), return_exceptions=True)
+        service.error = None
+        retried = await embedder.embed("swap")
+        await embedder.close()
+        return results, retried
+
+    results, retried = asyncio.run(scenario())
+    assert [str(result) for result in results] == ["rate limited", "rate limited"]
+    assert retried == [4.0]
+    assert service.batches == [["swap", "future"], ["swap"]]
+
+
+def test_close_stops_the_worker_and_a_new_loop_restarts_it():
+    embedder = BatchEmbedder(RecordingEmbeddingService(), max_wait_seconds=0)
+
+    async def embed_then_close():
+        embedding = await embedder.embed("swap")
+        worker = embedder._worker
+        await embedder.close()
+        return embedding, worker
+
+    for _ in range(2):
+        embedding, worker = asyncio.run(embed_then_close())
+        assert embedding == [4.0]
+        assert worker.cancelled()
+        assert embedder._worker is None
+
+
+def test_close_before_first_use_is_a_no_op():
+    asyncio.run(BatchEmbedder(RecordingEmbeddingService()).close())
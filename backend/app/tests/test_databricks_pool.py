@@ -0,0 +1,54 @@
+# backend/app/tests/test_databricks_pool.py
+import pytest
+
+pytest.importorskip("semantic_kernel")
+
+from app.plugins import trading_plugin
+from app.plugins.trading_plugin import DATABRICKS_IDLE_CHECK_SECONDS
+from app.tests.fakes import FakeDatabricksConnection
+
+
+def test_sequential_queries_reuse_one_pooled_connection(db_plugin, run_queries):
+    results = run_queries(db_plugin, "SELECT trade_id FROM trades", "SELECT trade_id FROM legs")
+
+    assert [raw_data for _, raw_data in results] == [[{"trade_id": "1"}, {"trade_id": "2"}]] * 2
+    assert len(db_plugin.opened) == 1
+    assert db_plugin.opened[0].executed == ["SELECT trade_id FROM trades", "SELECT trade_id FROM legs"]
+    assert db_plugin._connection_pool.qsize() == 1
+
+
+def test_long_idle_dead_connection_is_replaced(db_plugin, run_queries, patch_monotonic):
+    clock = patch_monotonic(trading_plugin)
+    stale = FakeDatabricksConnection(alive=False)
+    db_plugin._connection_pool.put_nowait((stale, clock.now))
+    clock.now += DATABRICKS_IDLE_CHECK_SECONDS + 1
+
+    run_queries(db_plugin, "SELECT trade_id FROM trades")
+
+    assert stale.closed
+    assert len(db_plugin.opened) == 1
+    assert db_plugin.opened[0].executed == ["SELECT trade_id FROM trades"]
+
+
+def test_recently_used_connection_skips_the_health_check(db_plugin, run_queries, patch_monotonic):
+    clock = patch_monotonic(trading_plugin)
+    pooled = FakeDatabricksConnection()
+    db_plugin._connection_pool.put_nowait((pooled, clock.now))
+    clock.now += DATABRICKS_IDLE_CHECK_SECONDS
+
+    run_queries(db_plugin, "SELECT trade_id FROM trades")
+
+    assert pooled.executed == ["SELECT trade_id FROM trades"]
+    assert db_plugin.opened == []
+
+
+def test_connection_that_fails_a_query_is_closed_not_pooled(db_plugin, run_queries):
+    broken = FakeDatabricksConnection(alive=False)
+    db_plugin._connection_pool.put_nowait((broken, trading_plugin.time.monotonic()))
+
+    [(result_text, raw_data)] = run_queries(db_plugin, "SELECT trade_id FROM trades")
+
+    assert raw_data is None
+    assert "session expired" in result_text
+    assert broken.closed
+    assert db_plugin._connection_pool.empty()
@@ -0,0 +1,53 @@
+# backend/app/tests/test_explanation_cache_gate.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("semantic_kernel")
+
+from app.plugins.trading_plugin import TradingPlugin
+
+
+class CountingChatService:
+    """Chat service stand-in that numbers each completion it returns"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def get_chat_message_contents(self, chat_history, settings):
+        self.calls += 1
+        return [SimpleNamespace(content=f"answer {self.calls}")]
+
+
+def make_plugin(monkeypatch, temperature: str) -> TradingPlugin:
+    """TradingPlugin configured with the given explanation temperature and a counting chat service"""
+    monkeypatch.setenv("EXPLANATION_TEMPERATURE", temperature)
+    plugin = TradingPlugin(None)
+    plugin.chat_service = CountingChatService()
+    return plugin
+
+
+def test_explanations_are_cached_at_temperature_zero(monkeypatch):
+    plugin = make_plugin(monkeypatch, "0")
+
+    async def scenario():
+        first = await plugin.explain_concept("What is a swap?")
+        second = await plugin.explain_concept("Explain a swap")
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert plugin.chat_service.calls == 1
+    assert first.endswith("answer 1") and second.endswith("answer 1")
+
+
+def test_sampled_explanations_are_not_cached(monkeypatch):
+    plugin = make_plugin(monkeypatch, "0.7")
+
+    async def scenario():
+        return [await plugin.explain_concept("swap") for _ in range(2)]
+
+    first, second = asyncio.run(scenario())
+    assert plugin.chat_service.calls == 2
+    assert first.endswith("answer 1") and second.endswith("answer 2")
+    assert plugin._explain_cache.stats["entries"] == 0
@@ -0,0 +1,56 @@
+# backend/app/tests/test_llm_cache.py
+from app.utils import llm_cache
+from app.utils.llm_cache import LLMCache
+
+
+def test_cache_key_is_stable_and_sensitive_to_inputs():
+    messages = [{"role": "user", "content": "What is a swap?"}]
+    key = LLMCache.cache_key("gpt-4o", messages, 0.0)
+
+    assert key == LLMCache.cache_key("gpt-4o", [dict(messages[0])], 0.0)
+    assert key != LLMCache.cache_key("gpt-4o-mini", messages, 0.0)
+    assert key != LLMCache.cache_key("gpt-4o", messages, 0.7)
+    assert key != LLMCache.cache_key("gpt-4o", [{"role": "user", "content": "What is a future?"}], 0.0)
+
+
+def test_get_returns_stored_response_and_counts_hits_and_misses():
+    cache = LLMCache(max_entries=10, ttl_seconds=60)
+
+    assert cache.get("k") is None
+    cache.set("k", "answer")
+    assert cache.get("k") == "answer"
+    assert cache.stats == {"entries": 1, "hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_entries_expire_after_ttl(patch_monotonic):
+    clock = patch_monotonic(llm_cache)
+    cache = LLMCache(max_entries=10, ttl_seconds=60)
+    cache.set("k", "answer")
+
+    clock.now += 60
+    assert cache.get("k") == "answer"
+    clock.now += 0.5
+    assert cache.get("k") is None
+    assert cache.stats["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LLMCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    # Reading "a" makes "b" the least recently used entry
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+
+
+def test_clear_removes_all_entries():
+    cache = LLMCache(max_entries=10, ttl_seconds=60)
+    cache.set("k", "answer")
+    cache.clear()
+
+    assert cache.get("k") is None
+    assert cache.stats["entries"] == 0
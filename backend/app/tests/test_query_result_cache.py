@@ -0,0 +1,73 @@
+# backend/app/tests/test_query_result_cache.py
+import pytest
+
+pytest.importorskip("semantic_kernel")
+
+from app.plugins import trading_plugin
+
+
+def executed(db_plugin):
+    """Every SQL statement sent to any fake connection, in order"""
+    return [sql_query for connection in db_plugin.opened for sql_query in connection.executed]
+
+
+def test_identical_select_is_served_from_the_cache(db_plugin, run_queries):
+    first, second = run_queries(db_plugin, "SELECT trade_id FROM trades", "select  trade_id\nFROM trades")
+
+    # Whitespace and case differences normalize to the same cached query
+    assert executed(db_plugin) == ["SELECT trade_id FROM trades"]
+    assert second[1] == first[1]
+    assert db_plugin.cache_stats()["query_results"] == {"entries": 1}
+
+
+def test_cached_result_expires_after_ttl(db_plugin, run_queries, patch_monotonic):
+    clock = patch_monotonic(trading_plugin)
+    db_plugin._query_cache_ttl = 60
+
+    run_queries(db_plugin, "SELECT trade_id FROM trades")
+    clock.now += 59.5
+    run_queries(db_plugin, "SELECT trade_id FROM trades")
+    clock.now += 0.5
+    run_queries(db_plugin, "SELECT trade_id FROM trades")
+
+    assert executed(db_plugin) == ["SELECT trade_id FROM trades"] * 2
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM trades WHERE trade_date = current_date",
+    "SELECT rand() AS sample, trade_id FROM trades",
+])
+def test_non_deterministic_queries_are_never_cached(db_plugin, run_queries, sql):
+    run_queries(db_plugin, sql, sql)
+
+    assert executed(db_plugin) == [sql, sql]
+    assert db_plugin.cache_stats()["query_results"] == {"entries": 0}
+
+
+def test_schema_version_change_bypasses_cached_results(db_plugin, run_queries, monkeypatch):
+    monkeypatch.setenv("DATABRICKS_SCHEMA_VERSION", "1")
+    run_queries(db_plugin, "SELECT trade_id FROM trades")
+    monkeypatch.setenv("DATABRICKS_SCHEMA_VERSION", "2")
+    run_queries(db_plugin, "SELECT trade_id FROM trades")
+
+    assert executed(db_plugin) == ["SELECT trade_id FROM trades"] * 2
+
+
+def test_zero_ttl_disables_the_cache(db_plugin, run_queries):
+    db_plugin._query_cache_ttl = 0
+
+    run_queries(db_plugin, "SELECT trade_id FROM trades", "SELECT trade_id FROM trades")
+
+    assert executed(db_plugin) == ["SELECT trade_id FROM trades"] * 2
+
+
+def test_truncated_flag_is_cached_with_the_rows(db_plugin, run_queries, monkeypatch):
+    monkeypatch.setattr(trading_plugin, "MAX_RESULT_ROWS", 1)
+
+    (first_text, first_rows), (second_text, second_rows) = run_queries(
+        db_plugin, "SELECT trade_id FROM trades", "SELECT trade_id FROM trades"
+    )
+
+    assert first_rows == second_rows == [{"trade_id": "1"}]
+    assert "result truncated" in first_text and "result truncated" in second_text
+    assert len(executed(db_plugin)) == 1
@@ -0,0 +1,58 @@
+# backend/app/tests/test_semantic_cache.py
+from app.utils import semantic_cache
+from app.utils.semantic_cache import SemanticCache
+
+
+def test_similar_embedding_hits_and_dissimilar_misses():
+    cache = SemanticCache(threshold=0.9, max_entries=10, ttl_seconds=60)
+    cache.put([1.0, 0.0, 0.0], "swap", "A swap exchanges cash flows.")
+
+    # Scale does not matter, only direction
+    assert cache.lookup([2.0, 0.1, 0.0]) == "A swap exchanges cash flows."
+    assert cache.lookup([0.0, 1.0, 0.0]) is None
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 1
+
+
+def test_best_match_wins_among_several_entries():
+    cache = SemanticCache(threshold=0.5, max_entries=10, ttl_seconds=60)
+    cache.put([1.0, 0.0], "swap", "swap answer")
+    cache.put([0.0, 1.0], "future", "future answer")
+
+    assert cache.lookup([0.2, 0.9]) == "future answer"
+    assert cache.lookup([0.9, 0.2]) == "swap answer"
+
+
+def test_zero_vectors_and_dimension_mismatch_are_misses():
+    cache = SemanticCache(threshold=0.9, max_entries=10, ttl_seconds=60)
+    cache.put([0.0, 0.0, 0.0], "empty", "never stored")
+    assert cache.stats["entries"] == 0
+
+    cache.put([1.0, 0.0, 0.0], "swap", "swap answer")
+    assert cache.lookup([0.0, 0.0, 0.0]) is None
+    assert cache.lookup([1.0, 0.0]) is None
+
+
+def test_entries_expire_after_ttl(patch_monotonic):
+    clock = patch_monotonic(semantic_cache)
+    cache = SemanticCache(threshold=0.9, max_entries=10, ttl_seconds=60)
+    cache.put([1.0, 0.0], "swap", "swap answer")
+
+    clock.now += 60
+    assert cache.lookup([1.0, 0.0]) == "swap answer"
+    clock.now += 0.5
+    assert cache.lookup([1.0, 0.0]) is None
+    assert cache.stats["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SemanticCache(threshold=0.99, max_entries=2, ttl_seconds=60)
+    cache.put([1.0, 0.0, 0.0], "a", "answer a")
+    cache.put([0.0, 1.0, 0.0], "b", "answer b")
+    # A hit on "a" makes "b" the least recently used entry
+    assert cache.lookup([1.0, 0.0, 0.0]) == "answer a"
+    cache.put([0.0, 0.0, 1.0], "c", "answer c")
+
+    assert cache.lookup([0.0, 1.0, 0.0]) is None
+    assert cache.lookup([1.0, 0.0, 0.0]) == "answer a"
+    assert cache.lookup([0.0, 0.0, 1.0]) == "answer c"
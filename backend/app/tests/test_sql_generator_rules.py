@@ -0,0 +1,73 @@
+# backend/app/tests/test_sql_generator_rules.py
+import pytest
+
+pytest.importorskip("semantic_kernel")
+
+from app.utils.sql_generator import DEFAULT_QUERY_LIMIT, SQLGenerator
+
+TEST_SCHEMA = {
+    "entity_trade_header": ["trade_id", "trade_date", "amount"],
+    "entity_trade_leg": ["trade_id", "leg_id", "notional"],
+    "trades": ["trade_id", "pnl"],
+}
+PREFIX = "trade_catalog.trade_schema."
+
+
+@pytest.fixture
+def generator(monkeypatch):
+    """SQLGenerator over a fixed schema instead of the cached/live one"""
+    monkeypatch.setattr(SQLGenerator, "_load_schema", lambda self: dict(TEST_SCHEMA))
+    return SQLGenerator()
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("show me 5 trades", 5),
+    ("list 25 rows from the ledger", 25),
+    ("top ten counterparties", 10),
+    ("first three results please", 3),
+    ("get 7 deals", 7),
+    ("limit to 20", 20),
+    # An explicit row count beats a lead phrase wherever it appears, as does an earlier lead phrase
+    ("top 5 trades with 10 rows", 10),
+    ("get 3 deals from the top 8", 8),
+    ("first two trades, 4 records each", 4),
+    # Number words count like digits
+    ("get one trade", 1),
+    ("show me nine deals", 9),
+    ("six results", 6),
+    ("someone got 5 deals", DEFAULT_QUERY_LIMIT),
+    ("give me a summary of pnl", 100),
+    ("latest trades", 20),
+    ("recent summary", 100),
+    ("trades for ACME", DEFAULT_QUERY_LIMIT),
+])
+def test_extract_limit_from_query(generator, query, expected):
+    assert generator._extract_limit_from_query(query) == expected
+
+
+def test_post_process_qualifies_bare_table_names(generator):
+    sql = "SELECT h.trade_id FROM entity_trade_header h JOIN entity_trade_leg l ON h.trade_id = l.trade_id LIMIT 5"
+
+    assert generator._post_process_sql(sql, "trades with legs") == (
+        f"SELECT h.trade_id FROM {PREFIX}entity_trade_header h "
+        f"JOIN {PREFIX}entity_trade_leg l ON h.trade_id = l.trade_id LIMIT 5"
+    )
+
+
+def test_post_process_leaves_qualified_names_and_partial_words_alone(generator):
+    sql = f"SELECT trades_count FROM {PREFIX}trades LIMIT 1"
+
+    assert generator._post_process_sql(sql, "count") == sql
+
+
+def test_post_process_rewrites_over_qualified_references(generator):
+    sql = "SELECT * FROM catalog.schema.trade_catalog.trade_schema.entity_trade_header LIMIT 3"
+
+    assert generator._post_process_sql(sql, "trades") == f"SELECT * FROM {PREFIX}entity_trade_header LIMIT 3"
+
+
+def test_post_process_appends_limit_from_the_question(generator):
+    sql = "SELECT * FROM trades"
+
+    assert generator._post_process_sql(sql, "top five trades") == f"SELECT * FROM {PREFIX}trades LIMIT 5"
+    assert generator._post_process_sql(sql, "all trades").endswith(f" LIMIT {DEFAULT_QUERY_LIMIT}")
@@ -0,0 +1,39 @@
+# backend/app/tests/test_sql_read_only_gate.py
+import pytest
+
+pytest.importorskip("sqlglot")
+pytest.importorskip("semantic_kernel")
+
+from app.plugins.trading_plugin import _is_read_only_statement
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM trade_catalog.trade_schema.trades LIMIT 10",
+    "select trade_id, sum(pnl) from trades group by trade_id order by 2 desc limit 5",
+    "WITH recent AS (SELECT * FROM trades WHERE trade_date > '2024-01-01') SELECT * FROM recent",
+    "SELECT trade_id FROM trades UNION SELECT trade_id FROM legs",
+    "SELECT trade_id FROM trades INTERSECT SELECT trade_id FROM legs",
+    "SELECT trade_id FROM trades EXCEPT SELECT trade_id FROM legs",
+    "(SELECT trade_id FROM trades)",
+    "SELECT * FROM trades WHERE note = 'please drop table trades; delete everything'",
+    "SELECT updated_at, created_by FROM trades",
+])
+def test_read_only_queries_are_accepted(sql):
+    assert _is_read_only_statement(sql)
+
+
+@pytest.mark.parametrize("sql", [
+    "DELETE FROM trades",
+    "DROP TABLE trades",
+    "UPDATE trades SET pnl = 0",
+    "INSERT INTO trades SELECT * FROM trades_backup",
+    "TRUNCATE TABLE trades",
+    "CREATE TABLE t AS SELECT * FROM trades",
+    "SELECT 1; DROP TABLE trades",
+    "SELECT * FROM trades; SELECT * FROM legs",
+    "WITH gone AS (DELETE FROM trades) SELECT 1",
+    "SELEC * FROM trades",
+    "",
+])
+def test_writes_stacked_and_invalid_statements_are_rejected(sql):
+    assert not _is_read_only_statement(sql)
@@ -0,0 +1,74 @@
+# backend/app/utils/batch_embedder.py
+import asyncio
+import logging
+from typing import Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class BatchEmbedder:
+    """Coalesce concurrent embedding requests into batched embedding API calls"""
+
+    def __init__(self, embedding_service, max_batch_size: int = 16, max_wait_seconds: float = 0.02):
+        logger.info("⭐ BatchEmbedder.__init__() - max_batch_size=%s, max_wait=%ss", max_batch_size, max_wait_seconds)
+        self.embedding_service = embedding_service
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self._queue: Optional["asyncio.Queue[Tuple[str, asyncio.Future]]"] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def _ensure_worker(self):
+        """Start the batching task on first use, inside the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def embed(self, text: str) -> Any:
+        """Queue a text for the next batch and wait for its embedding"""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _collect_batch(self) -> List[Tuple[str, asyncio.Future]]:
+        """Wait for one request, then gather more until the batch is full or the wait window closes"""
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait_seconds
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        """Batching loop: one embedding API call per collected batch"""
+        while True:
+            batch = await self._collect_batch()
+            texts = [text for text, _ in batch]
+            try:
+                embeddings = await self.embedding_service.generate_embeddings(texts)
+                logger.info("⭐ Embedded batch of %s text(s) in one request", len(texts))
+                for (_, future), embedding in zip(batch, embeddings):
+                    if not future.done():
+                        future.set_result(embedding)
+            except Exception as e:
+                logger.warning("⭐ Batch embedding failed: %s", e)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    async def close(self):
+        """Stop the batching task"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
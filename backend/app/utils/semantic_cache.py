@@ -0,0 +1,107 @@
+# backend/app/utils/semantic_cache.py
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """In-memory cache of LLM responses matched by embedding cosine similarity"""
+
+    def __init__(self, threshold: float = 0.92, max_entries: int = 1000, ttl_seconds: float = 3600):
+        logger.info(
+            "⭐ SemanticCache.__init__() - threshold=%s, max_entries=%s, ttl=%ss", threshold, max_entries, ttl_seconds
+        )
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # key -> (unit embedding, response, stored_at); insertion order doubles as LRU order
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: List[str] = []
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> Optional[np.ndarray]:
+        """Convert an embedding to a float32 unit vector (None for a zero vector)"""
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            return None
+        return vector / norm
+
+    def _evict_expired(self, now: float):
+        """Drop entries older than the TTL"""
+        expired = [key for key, (_, _, stored_at) in self._entries.items() if now - stored_at > self.ttl_seconds]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._matrix = None
+
+    def _get_matrix(self) -> Optional[np.ndarray]:
+        """Stack cached embeddings into one matrix, rebuilt only after the entries change"""
+        if self._matrix is None and self._entries:
+            self._matrix_keys = list(self._entries.keys())
+            self._matrix = np.vstack([self._entries[key][0] for key in self._matrix_keys])
+        return self._matrix
+
+    def lookup(self, embedding: Sequence[float]) -> Optional[str]:
+        """Return the cached response most similar to the embedding, if above the threshold"""
+        query = self._normalize(embedding)
+        with self._lock:
+            self._evict_expired(time.monotonic())
+            matrix = self._get_matrix() if query is not None else None
+            if matrix is None or matrix.shape[1] != query.shape[0]:
+                self.misses += 1
+                return None
+
+            scores = matrix @ query
+            best = int(np.argmax(scores))
+            best_score = float(scores[best])
+            if best_score < self.threshold:
+                self.misses += 1
+                logger.info("⭐ Semantic cache miss (best similarity %.3f)", best_score)
+                return None
+
+            key = self._matrix_keys[best]
+            self._entries.move_to_end(key)
+            self.hits += 1
+            logger.info("⭐ Semantic cache hit for '%s' (similarity %.3f)", key, best_score)
+            return self._entries[key][1]
+
+    def put(self, embedding: Sequence[float], key: str, response: str):
+        """Store a response under its embedding, evicting the least recently used entries"""
+        vector = self._normalize(embedding)
+        if vector is None:
+            return
+        with self._lock:
+            self._entries[key] = (vector, response, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def clear(self):
+        """Remove all cached entries"""
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+            self._matrix_keys = []
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters for observability"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
@@ -2,11 +2,79 @@
 import json
 import logging
 import re
+import string
 from pathlib import Path
 from typing import Dict, List, Optional, Union, Any
 
+from semantic_kernel.contents import ChatHistory
+from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion, OpenAIChatPromptExecutionSettings
+
 logger = logging.getLogger(__name__)
 
+# Lowercase ASCII and drop underscores/spaces in a single str.translate pass
+_NAME_NORM_TABLE = {ord(c): c.lower() for c in string.ascii_uppercase}
+_NAME_NORM_TABLE.update({ord('_'): None, ord(' '): None})
+
+
+def _normalize_name(name: str) -> str:
+    """Normalize a table/column name for lookups ('Entity Trade_Header' -> 'entitytradeheader')"""
+    return name.translate(_NAME_NORM_TABLE)
+
+
+_WORD_TO_NUMBER = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10
+}
+_LIMIT_NUMBER = r"\d+|" + "|".join(_WORD_TO_NUMBER)
+
+# Limit phrases by precedence: an explicit "N rows" count beats "top N", which beats "first N", and so on
+LIMIT_PHRASES = (
+    ("count", r"(?P<count>{number})\s+(?:records?|rows?|results?)"),
+    ("top", r"top\s+(?P<top>{number})"),
+    ("first", r"first\s+(?P<first>{number})"),
+    ("show_me", r"show\s+me\s+(?P<show_me>{number})"),
+    ("get", r"get\s+(?P<get>{number})"),
+    ("limit_to", r"limit\s+to\s+(?P<limit_to>{number})"),
+)
+_LIMIT_PRECEDENCE = {phrase_name: rank for rank, (phrase_name, _) in enumerate(LIMIT_PHRASES)}
+# Numeric and number-word limit phrases in one alternation ("5 rows", "top ten", "limit to 20")
+_LIMIT_RE = re.compile("|".join(
+    rf"\b{pattern.format(number=_LIMIT_NUMBER)}\b" for _, pattern in LIMIT_PHRASES
+))
+
+# Default LIMIT by query context, checked in order; first match wins
+CONTEXT_QUERY_LIMITS = (
+    ("summary", ("summary", "overview", "total", "count"), 100),
+    ("recent", ("recent", "latest", "newest"), 20),
+)
+DEFAULT_QUERY_LIMIT = 10
+# All context keywords in one alternation, one named group per context
+_CONTEXT_LIMIT_RE = re.compile("|".join(
+    f"(?P<{context_name}>{'|'.join(map(re.escape, keywords))})"
+    for context_name, keywords, _ in CONTEXT_QUERY_LIMITS
+))
+
+# Clause keywords that mark a line as part of the SQL body when cleaning LLM output
+_SQL_CLAUSE_RE = re.compile(r"FROM|WHERE|JOIN|GROUP BY|ORDER BY|LIMIT|HAVING", re.IGNORECASE)
+
+# SQL safety checks, compiled once: destructive keywords (whole words) and injection patterns
+_DESTRUCTIVE_KEYWORD_RE = re.compile(
+    r"\b(?:drop|delete|update|insert|alter|truncate|create|modify|grant|revoke"
+    r"|exec|execute|merge|replace|commit|rollback)\b"
+)
+_INJECTION_RE = re.compile(
+    r";\s*--|;\s*#|;\s*\/\*|union.*select|exec\s*\(?|xp_|sp_|waitfor.*delay",
+    re.IGNORECASE
+)
+# Quoted strings and identifiers ('' / "" / `` escapes included); unterminated quotes are left in place
+_SQL_QUOTED_RE = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|`(?:[^`]|``)*`")
+
+
+def strip_sql_literals(sql_query: str) -> str:
+    """Blank out quoted literals and identifiers so keyword scans only see SQL syntax"""
+    return _SQL_QUOTED_RE.sub("''", sql_query)
+
+
 class SQLGenerator:
     """Natural Language to SQL generator using LLM with schema awareness"""
     
@@ -14,6 +82,16 @@ class SQLGenerator:
         logger.info("⭐ SQLGenerator.__init__() - Entry")
         self.schema_data = self._load_schema()
         self.schema_context = self._build_schema_context()
+        self.system_prompt = self._build_system_prompt()
+        self._table_index = {_normalize_name(table_name): table_name for table_name in self.schema_data}
+        # Every schema table in one alternation; the lookbehind skips names that are already qualified
+        self._unqualified_table_re = re.compile(
+            r"(?<![\w.])(?:" + "|".join(map(re.escape, sorted(self.schema_data, key=len, reverse=True))) + r")\b"
+        ) if self.schema_data else None
+        # System prefix built once; each request copies its messages and appends the user turn
+        self._history_template = ChatHistory()
+        self._history_template.add_system_message(self.system_prompt)
+        self._settings_by_service: Dict[str, OpenAIChatPromptExecutionSettings] = {}
         logger.info(f"⭐ SQL Generator initialized with {len(self.schema_data)} tables")
         logger.info("⭐ SQLGenerator.__init__() - Exit")
         
@@ -48,6 +126,29 @@ class SQLGenerator:
             logger.info("⭐ _load_schema() - Exit (error)")
             return {}
     
+    def _build_system_prompt(self) -> str:
+        """Build the static SQL-generation system prompt (schema + instructions), once per schema"""
+        return f"""You are a SQL expert that converts natural language to efficient SQL queries.
+
+Database Schema Context:
+{self.schema_context}
+
+CRITICAL INSTRUCTIONS:
+1. Generate a clean, efficient SQL SELECT query that answers the user's request
+2. Use fully qualified table names in EXACTLY this format: trade_catalog.trade_schema.table_name
+3. DO NOT use catalog.schema.table_name format
+4. DO NOT duplicate catalog or schema names
+5. Include appropriate filters to avoid returning excessive data
+6. Use LIMIT to restrict results to a reasonable number (10-100 rows typically)
+7. Ensure the query is syntactically correct for Databricks SQL
+8. Only return the SQL query, no explanations or additional text
+
+Example of CORRECT format: 
+SELECT * FROM trade_catalog.trade_schema.entity_trade_header LIMIT 10
+
+Example of INCORRECT format:
+SELECT * FROM catalog.schema.trade_catalog.trade_schema.entity_trade_header"""
+    
     def _build_schema_context(self) -> str:
         """Build comprehensive schema context for LLM prompts"""
         logger.info("⭐ _build_schema_context() - Entry")
@@ -57,14 +158,13 @@ class SQLGenerator:
             logger.info("⭐ _build_schema_context() - Exit")
             return "No schema information available."
         
-        context = "Database Schema Information:\n\n"
+        parts = ["Database Schema Information:\n\n"]
         
         for table_name, columns in self.schema_data.items():
-            context += f"Table: {table_name}\n"
-            context += f"Columns: {', '.join(columns)}\n\n"
+            parts.append(f"Table: {table_name}\nColumns: {', '.join(columns)}\n\n")
         
         # Add common query patterns and examples
-        context += """
+        parts.append("""
 Common Query Patterns:
 - Use LIMIT for restricting results: SELECT * FROM table LIMIT 10
 - Filter with WHERE: SELECT * FROM table WHERE column = 'value'
@@ -77,7 +177,8 @@ Important Notes:
 - Use proper quoting for column names with spaces or special characters
 - Include appropriate filters to avoid returning too much data
 - Use appropriate date filters for time-based queries
-"""
+""")
+        context = "".join(parts)
         logger.info("⭐ Schema context built successfully")
         logger.info("⭐ _build_schema_context() - Exit")
         return context
@@ -88,37 +189,24 @@ Important Notes:
         
         query_lower = natural_language_query.lower()
         
-        # Pattern matching for numbers
-        patterns = [
-            r"(\d+)\s+(records?|rows?|results?)",
-            r"top\s+(\d+)",
-            r"first\s+(\d+)",
-            r"show\s+me\s+(\d+)",
-            r"get\s+(\d+)",
-            r"limit\s+to\s+(\d+)"
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, query_lower)
-            if match:
-                try:
-                    limit = int(match.group(1))
-                    logger.info(f"⭐ Extracted limit: {limit} from pattern: {pattern}")
-                    logger.info("⭐ _extract_limit_from_query() - Exit (pattern match)")
-                    return limit
-                except ValueError:
-                    continue
-        
-        # Decision: Default limit based on query context
-        if any(word in query_lower for word in ["summary", "overview", "total", "count"]):
-            limit = 100
-            logger.info("⭐ Decision: Using summary limit of 100")
-        elif any(word in query_lower for word in ["recent", "latest", "newest"]):
-            limit = 20
-            logger.info("⭐ Decision: Using recent items limit of 20")
-        else:
-            limit = 10
-            logger.info("⭐ Decision: Using default limit of 10")
+        # Decision: Explicit limit in the query (digits or number words); highest-precedence phrase wins
+        match = min(
+            _LIMIT_RE.finditer(query_lower), key=lambda m: _LIMIT_PRECEDENCE[m.lastgroup], default=None
+        )
+        if match:
+            value = match.group(match.lastgroup)
+            limit = int(value) if value.isdigit() else _WORD_TO_NUMBER[value]
+            logger.info(f"⭐ Extracted limit: {limit} from phrase: '{match.group(0)}'")
+            logger.info("⭐ _extract_limit_from_query() - Exit (pattern match)")
+            return limit
+        
+        # Decision: Default limit based on query context (one regex pass, first context in order wins)
+        matched_contexts = {m.lastgroup for m in _CONTEXT_LIMIT_RE.finditer(query_lower)}
+        context_name, limit = next(
+            ((name, context_limit) for name, _, context_limit in CONTEXT_QUERY_LIMITS if name in matched_contexts),
+            ("default", DEFAULT_QUERY_LIMIT)
+        )
+        logger.info(f"⭐ Decision: Using {context_name} limit of {limit}")
         
         logger.info(f"⭐ Final limit: {limit}")
         logger.info("⭐ _extract_limit_from_query() - Exit (context-based)")
@@ -135,37 +223,25 @@ Important Notes:
             
         sql_lower = sql_query.lower().strip()
         
-        # Block destructive operations
-        destructive_keywords = [
-            "drop", "delete", "update", "insert", "alter", "truncate", 
-            "create", "modify", "grant", "revoke", "exec", "execute",
-            "merge", "replace", "commit", "rollback"
-        ]
-        
-        # Decision: Check for destructive keywords
-        for keyword in destructive_keywords:
-            if re.search(rf'\b{keyword}\b', sql_lower):
-                logger.warning(f"💥 SQL safety validation failed: found destructive keyword '{keyword}'")
-                logger.info("⭐ _validate_sql_safety() - Exit (invalid)")
-                return False
+        # Decision: Check for destructive keywords outside quoted literals ('drop shipment' is data, not DDL)
+        destructive_match = _DESTRUCTIVE_KEYWORD_RE.search(strip_sql_literals(sql_lower))
+        if destructive_match:
+            logger.warning(f"💥 SQL safety validation failed: found destructive keyword '{destructive_match.group()}'")
+            logger.info("⭐ _validate_sql_safety() - Exit (invalid)")
+            return False
         
         # Decision: Only allow SELECT queries (or WITH queries that are essentially SELECTs)
-        if not (sql_lower.startswith('select') or sql_lower.startswith('with')):
+        if not sql_lower.startswith(('select', 'with')):
             logger.warning("💥 SQL safety validation failed: query doesn't start with SELECT or WITH")
             logger.info("⭐ _validate_sql_safety() - Exit (invalid)")
             return False
         
         # Decision: Check for potential injection patterns
-        injection_patterns = [
-            r";\s*--", r";\s*#", r";\s*\/\*", r"union.*select",
-            r"exec\s*\(?", r"xp_", r"sp_", r"waitfor.*delay"
-        ]
-        
-        for pattern in injection_patterns:
-            if re.search(pattern, sql_lower, re.IGNORECASE):
-                logger.warning(f"💥 SQL safety validation failed: found injection pattern '{pattern}'")
-                logger.info("⭐ _validate_sql_safety() - Exit (invalid)")
-                return False
+        injection_match = _INJECTION_RE.search(sql_lower)
+        if injection_match:
+            logger.warning(f"💥 SQL safety validation failed: found injection pattern '{injection_match.group()}'")
+            logger.info("⭐ _validate_sql_safety() - Exit (invalid)")
+            return False
         
         logger.info("⭐ SQL safety validation passed")
         logger.info("⭐ _validate_sql_safety() - Exit (valid)")
@@ -194,14 +270,13 @@ Important Notes:
                 sql_query = sql_query.replace(bad_table_ref, correct_ref)
                 logger.info(f"⭐ Fixed table reference: {bad_table_ref} -> {correct_ref}")
             
-            # Decision: Also handle simple table names without qualification
-            for table_name in self.schema_data.keys():
-                # Pattern for unqualified table names
-                simple_pattern = rf'\b{table_name}\b'
-                if re.search(simple_pattern, sql_query) and f"{correct_prefix}{table_name}" not in sql_query:
-                    correct_ref = f"{correct_prefix}{table_name}"
-                    sql_query = re.sub(simple_pattern, correct_ref, sql_query)
-                    logger.info(f"⭐ Qualified table name: {table_name} -> {correct_ref}")
+            # Decision: Also handle simple table names without qualification, in one pass over the query
+            if self._unqualified_table_re is not None:
+                sql_query, qualified_count = self._unqualified_table_re.subn(
+                    lambda match: f"{correct_prefix}{match.group(0)}", sql_query
+                )
+                if qualified_count:
+                    logger.info(f"⭐ Qualified {qualified_count} unqualified table name(s) with {correct_prefix}")
             
             # Decision: Ensure LIMIT is present
             if "limit" not in sql_query.lower():
@@ -216,43 +291,28 @@ Important Notes:
         logger.info("⭐ _post_process_sql() - Exit")
         return sql_query
     
+    def _get_execution_settings(self, service_id: str) -> OpenAIChatPromptExecutionSettings:
+        """Get (or build once) the SQL generation settings for a chat service"""
+        settings = self._settings_by_service.get(service_id)
+        if settings is None:
+            settings = OpenAIChatPromptExecutionSettings(
+                service_id=service_id,
+                max_tokens=1000,
+                temperature=0.1  # Low temperature for consistent SQL generation
+            )
+            self._settings_by_service[service_id] = settings
+        return settings
+    
     async def generate_sql_from_natural_language(self, natural_language_query: str, kernel) -> str:
         """Generate SQL from natural language using LLM"""
         logger.info(f"⭐ generate_sql_from_natural_language() - Entry: '{natural_language_query[:50]}...'")
         
         try:
-            from semantic_kernel.contents import ChatHistory
-            from semantic_kernel.connectors.ai.open_ai import OpenAIChatPromptExecutionSettings
-            
-            # Build the prompt with schema context
-            prompt = f"""
-            Database Schema Context:
-            {self.schema_context}
-
-            User Request: {natural_language_query}
-
-            CRITICAL INSTRUCTIONS:
-            1. Generate a clean, efficient SQL SELECT query that answers the user's request
-            2. Use fully qualified table names in EXACTLY this format: trade_catalog.trade_schema.table_name
-            3. DO NOT use catalog.schema.table_name format
-            4. DO NOT duplicate catalog or schema names
-            5. Include appropriate filters to avoid returning excessive data
-            6. Use LIMIT to restrict results to a reasonable number (10-100 rows typically)
-            7. Ensure the query is syntactically correct for Databricks SQL
-            8. Only return the SQL query, no explanations or additional text
-
-            Example of CORRECT format: 
-            SELECT * FROM trade_catalog.trade_schema.entity_trade_header LIMIT 10
-
-            Example of INCORRECT format:
-            SELECT * FROM catalog.schema.trade_catalog.trade_schema.entity_trade_header
-
-            SQL Query:
-            """
+            # Static schema + instructions go first (system message); only the request varies
+            prompt = f"User Request: {natural_language_query}\n\nSQL Query:"
             
             # Create chat history
-            chat_history = ChatHistory()
-            chat_history.add_system_message("You are a SQL expert that converts natural language to efficient SQL queries.")
+            chat_history = ChatHistory(messages=list(self._history_template.messages))
             chat_history.add_user_message(prompt)
             
             # Get the chat service with improved error handling
@@ -262,11 +322,7 @@ Important Notes:
                 raise ValueError("Azure OpenAI chat service not available in kernel")
             
             # Generate SQL
-            settings = OpenAIChatPromptExecutionSettings(
-                service_id=getattr(chat_service, "service_id", "azure_gpt4o"),
-                max_tokens=1000,
-                temperature=0.1  # Low temperature for consistent SQL generation
-            )
+            settings = self._get_execution_settings(getattr(chat_service, "service_id", "azure_gpt4o"))
             
             logger.info("⭐ Generating SQL with LLM...")
             result = await chat_service.get_chat_message_contents(
@@ -319,7 +375,6 @@ Important Notes:
         
         # Strategy 2: Get AzureChatCompletion service
         try:
-            from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
             services = kernel.get_services(type=AzureChatCompletion)
             if services:
                 chat_service = next(iter(services.values()))
@@ -371,7 +426,7 @@ Important Notes:
                 logger.info("⭐ Found SQL start")
             elif in_sql and line:
                 # Continue collecting SQL lines
-                if any(keyword in line.upper() for keyword in ['FROM', 'WHERE', 'JOIN', 'GROUP BY', 'ORDER BY', 'LIMIT', 'HAVING']):
+                if _SQL_CLAUSE_RE.search(line):
                     sql_lines.append(line)
                 elif line.endswith(';'):
                     sql_lines.append(line.rstrip(';'))
@@ -401,7 +456,7 @@ Important Notes:
     def get_table_columns(self, table_name: str) -> List[str]:
         """Get columns for a specific table"""
         logger.info(f"⭐ get_table_columns() - Entry: {table_name}")
-        columns = self.schema_data.get(table_name.lower(), [])
+        columns = self.schema_data.get(self._table_index.get(_normalize_name(table_name)), [])
         logger.info(f"⭐ Columns found: {len(columns)}")
         logger.info("⭐ get_table_columns() - Exit")
         return columns
@@ -409,7 +464,7 @@ Important Notes:
     def validate_table_exists(self, table_name: str) -> bool:
         """Check if table exists in schema"""
         logger.info(f"⭐ validate_table_exists() - Entry: {table_name}")
-        exists = table_name.lower() in self.schema_data
+        exists = _normalize_name(table_name) in self._table_index
         logger.info(f"⭐ Table exists: {exists}")
         logger.info("⭐ validate_table_exists() - Exit")
         return exists
@@ -423,9 +478,9 @@ Important Notes:
             logger.info("⭐ get_schema_summary() - Exit")
             return "No schema data available"
         
-        summary = f"Schema contains {len(self.schema_data)} tables:\n"
-        for table_name, columns in self.schema_data.items():
-            summary += f"- {table_name}: {len(columns)} columns\n"
+        parts = [f"Schema contains {len(self.schema_data)} tables:\n"]
+        parts.extend(f"- {table_name}: {len(columns)} columns\n" for table_name, columns in self.schema_data.items())
+        summary = "".join(parts)
         
         logger.info(f"⭐ Schema summary: {len(self.schema_data)} tables")
         logger.info("⭐ get_schema_summary() - Exit")
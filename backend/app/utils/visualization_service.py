@@ -1,10 +1,13 @@
 # backend/app/utils/visualization_service.py
+from __future__ import annotations
+
 import json
 import logging
 from typing import Dict, List, Any, Optional
 import io
 import base64
 import re
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -20,11 +23,34 @@ except ImportError as e:
     pd = None
     plt = None
 
+# Chart-type keywords in priority order: (intent, chart type, keyword alternation)
+CHART_TYPE_PATTERNS = (
+    ("trend", "bar", r"trend|over time|history|timeline|growth"),
+    ("distribution", "pie", r"distribution|percentage|ratio|share|breakdown"),
+    ("comparison", "bar", r"compare|ranking|top|best|worst|comparison|graph|chart|visualize"),
+    ("scatter", "scatter", r"relationship|correlation|scatter"),
+)
+# All intents folded into one named-group regex so a query is scanned once; keywords match whole
+# words with an optional plural, like the plugin's visualization gate ('trends' matches 'trend',
+# 'stop' and 'topic' do not match 'top')
+_CHART_INTENT_RE = re.compile("|".join(f"(?P<{intent}>\\b(?:{keywords})s?\\b)" for intent, _, keywords in CHART_TYPE_PATTERNS))
+# Column-name fragments that mark a column as a date/time axis ('trade_date', 'settle_time')
+_DATE_COLUMN_RE = re.compile(r"date|time|year|month|day", re.IGNORECASE)
+_DATETIME_COLUMN_RE = re.compile(r"date|time", re.IGNORECASE)
+
 class VisualizationService:
     """Service for generating charts and graphs from query results"""
     
     def __init__(self):
         logger.info("⭐ ENTER: VisualizationService.__init__()")
+        self._pyplot_lock = threading.Lock()
+        # Chart type -> renderer, built once instead of an if/elif chain per chart
+        self._chart_renderers = {
+            "bar": self._create_bar_chart,
+            "line": self._create_line_chart,
+            "pie": self._create_pie_chart,
+            "scatter": self._create_scatter_chart,
+        }
         if VISUALIZATION_AVAILABLE:
             plt.style.use('default')
             logger.info("⭐ Matplotlib style set to default")
@@ -47,33 +73,16 @@ class VisualizationService:
         # Keyword-based detection
         logger.info("⭐ START: Keyword-based chart type detection")
         
-        trend_keywords = ["trend", "over time", "history", "timeline", "growth"]
-        trend_matches = [word for word in trend_keywords if word in query_lower]
-        if trend_matches:
-            logger.info(f"⭐ DECISION: Identified trend keywords: {trend_matches}")
-            logger.info("⭐ EXIT: _detect_chart_type_from_query() -> 'bar' (trend)")
-            return "bar" 
-        
-        distribution_keywords = ["distribution", "percentage", "ratio", "share", "breakdown"]
-        distribution_matches = [word for word in distribution_keywords if word in query_lower]
-        if distribution_matches:
-            logger.info(f"⭐ DECISION: Identified distribution keywords: {distribution_matches}")
-            logger.info("⭐ EXIT: _detect_chart_type_from_query() -> 'pie'")
-            return "pie"
-        
-        comparison_keywords = ["compare", "ranking", "top", "best", "worst", "comparison", "graph", "chart", "visualize"]
-        comparison_matches = [word for word in comparison_keywords if word in query_lower]
-        if comparison_matches:
-            logger.info(f"⭐ DECISION: Identified comparison keywords: {comparison_matches}")
-            logger.info("⭐ EXIT: _detect_chart_type_from_query() -> 'bar' (comparison)")
-            return "bar"
+        matches_by_intent: Dict[str, List[str]] = {}
+        for match in _CHART_INTENT_RE.finditer(query_lower):
+            matches_by_intent.setdefault(match.lastgroup, []).append(match.group())
         
-        scatter_keywords = ["relationship", "correlation", "scatter"]
-        scatter_matches = [word for word in scatter_keywords if word in query_lower]
-        if scatter_matches:
-            logger.info(f"⭐ DECISION: Identified scatter keywords: {scatter_matches}")
-            logger.info("⭐ EXIT: _detect_chart_type_from_query() -> 'scatter'")
-            return "scatter"
+        for intent, chart_type, _ in CHART_TYPE_PATTERNS:
+            matches = matches_by_intent.get(intent)
+            if matches:
+                logger.info(f"⭐ DECISION: Identified {intent} keywords: {matches}")
+                logger.info(f"⭐ EXIT: _detect_chart_type_from_query() -> '{chart_type}' ({intent})")
+                return chart_type
         
         # Default to bar chart if no specific type is detected but data is present
         if data and len(data) > 0:
@@ -88,7 +97,7 @@ class VisualizationService:
             try:
                 df = pd.DataFrame(data)
                 numeric_columns = df.select_dtypes(include=['number']).columns.tolist()
-                date_columns = [col for col in df.columns if any(keyword in col.lower() for keyword in ['date', 'time', 'year', 'month', 'day'])]
+                date_columns = [col for col in df.columns if _DATE_COLUMN_RE.search(col)]
                 
                 logger.info(f"⭐ Found {len(numeric_columns)} numeric columns: {numeric_columns}")
                 logger.info(f"⭐ Found {len(date_columns)} date columns: {date_columns}")
@@ -115,6 +124,12 @@ class VisualizationService:
     
     def generate_chart(self, data: List[Dict], query: str, title: str = "") -> Optional[Dict]:
         """Generate chart from data and return base64 encoded image"""
+        # pyplot keeps global figure state; serialize renders coming from worker threads
+        with self._pyplot_lock:
+            return self._generate_chart(data, query, title)
+    
+    def _generate_chart(self, data: List[Dict], query: str, title: str = "") -> Optional[Dict]:
+        """Render the chart (caller holds the pyplot lock)"""
         logger.info(f"⭐ ENTER: generate_chart(data_rows={len(data)}, query='{query[:30]}...', title='{title}')")
         
         if not data:
@@ -156,18 +171,12 @@ class VisualizationService:
             fig, ax = plt.subplots(figsize=(10, 6))
             
             logger.info(f"⭐ Creating {chart_type} chart")
-            if chart_type == "bar":
-                self._create_bar_chart(df, ax, query)
-            elif chart_type == "line":
-                self._create_line_chart(df, ax, query)
-            elif chart_type == "pie":
-                self._create_pie_chart(df, ax, query)
-            elif chart_type == "scatter":
-                self._create_scatter_chart(df, ax, query)
-            else:
+            renderer = self._chart_renderers.get(chart_type)
+            if renderer is None:
                 logger.warning(f"⭐ DECISION: Unknown chart type: {chart_type}, defaulting to bar")
-                self._create_bar_chart(df, ax, query)
                 chart_type = "bar"
+                renderer = self._create_bar_chart
+            renderer(df, ax, query)
             
             if not title:
                 logger.info("⭐ Generating chart title")
@@ -277,7 +286,7 @@ class VisualizationService:
         value_col = numeric_cols[0]
         logger.info(f"⭐ DECISION: Using value column: {value_col}")
         
-        date_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['date', 'time'])]
+        date_cols = [col for col in df.columns if _DATETIME_COLUMN_RE.search(col)]
         logger.info(f"⭐ Date columns found: {date_cols}")
         
         x_values = None